@@ -1,12 +1,27 @@
 # -*- coding: utf-8 -*-
-import datetime, json, math, pathlib
-from typing import Dict, Any, List
+import bisect, collections, dataclasses, datetime, json, math, os, pathlib, threading, time
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+from .models import DAY_FIELDS, CopticDate, DayRecord, Feast, FastingPeriod, FastingStatus, Saint
 
 # --- Constantes ---
-COPTIC_MONTHS_AR = ["توت","بابه","هاتور","كيهك","طوبه","أمشير","برمهات","برموده","بشنس","بؤونه","أبيب","مسرى","النسئ"]
 MAJOR_FEAST_CODES = {"ANNUNCIATION", "NATIVITY", "THEOPHANY", "PASCHA", "ASCENSION", "PENTECOST", "TRANSFIGURATION"}
 PARAMON_CODES = {"NATIVITY_PARAMON", "THEOPHANY_PARAMON"}
 WEEKDAY_MAP = {"MON": "MON", "TUE": "TUE", "WED": "WED", "THU": "THU", "FRI": "FRI", "SAT": "SAT", "SUN": "SUN"}
+# 1 Tout de l'an 1 (ère des Martyrs) = 29 août 284 julien, en ordinal grégorien (JDN 1825030)
+COPTIC_EPOCH_ORDINAL = datetime.date(284, 8, 29).toordinal()
+# Années civiles prises en charge : compile_liturgical_year lit aussi les années voisines (bornes de datetime)
+MIN_YEAR, MAX_YEAR = 2, 9998
+# Nombre d'années liturgiques compilées gardées en mémoire (LRU)
+YEAR_CACHE_SIZE = int(os.environ.get("LITURGICAL_YEAR_CACHE_SIZE", "64"))
+# Statuts de jeûne fixes, partagés entre tous les jours
+FAST_PARAMON = FastingStatus(True, "PARAMON", "strict", "PARAMON")
+FAST_MAJOR_FEAST = FastingStatus(False, None, "none", "MAJOR_FEAST_OVERRIDE")
+FAST_FIFTY_DAYS = FastingStatus(False, None, "none", "FIFTY_DAYS")
+FAST_WED_FRI = FastingStatus(True, "WED_FRI", "normal", "WED_FRI")
+FAST_NONE = FastingStatus(False, None, "none", "NONE")
+# Instrumentation (app/metrics.py) : appelée avec (étape, début) après chaque étape de build_day,
+# renvoie l'instant courant. None : aucune mesure, un seul test par étape.
+STAGE_HOOK: Optional[Callable[[str, float], float]] = None
 
 
 # --- Fonctions de base du calendrier ---
@@ -15,32 +30,37 @@ def is_gregorian_leap(year: int) -> bool:
     """Vérifie si une année grégorienne est bissextile."""
     return (year % 4 == 0 and year % 100 != 0) or (year % 400 == 0)
 
-def gregorian_to_coptic(gdate: datetime.date) -> Dict[str, Any]:
+def is_coptic_leap(coptic_year: int) -> bool:
+    """Vérifie si une année copte est bissextile (Nasi de 6 jours)."""
+    return coptic_year % 4 == 3
+
+def coptic_days_in_month(month: int, coptic_year: int) -> int:
+    """Nombre de jours d'un mois copte (30, ou 5/6 pour le Nasi)."""
+    if month == 13:
+        return 6 if is_coptic_leap(coptic_year) else 5
+    return 30
+
+def coptic_to_ordinal(day: int, month: int, coptic_year: int) -> int:
+    """Convertit une date copte en numéro de jour (ordinal grégorien proleptique)."""
+    if not 1 <= month <= 13 or not 1 <= day <= coptic_days_in_month(month, coptic_year):
+        raise ValueError(f"Date coptique invalide : {day}/{month}/{coptic_year}")
+    return COPTIC_EPOCH_ORDINAL - 1 + 365 * (coptic_year - 1) + coptic_year // 4 + 30 * (month - 1) + day
+
+def ordinal_to_coptic(ordinal: int):
+    """Convertit un numéro de jour en triplet copte (jour, mois, année)."""
+    n = ordinal - COPTIC_EPOCH_ORDINAL
+    coptic_year = (4 * n + 1463) // 1461
+    doy = n - 365 * (coptic_year - 1) - coptic_year // 4
+    return doy % 30 + 1, doy // 30 + 1, coptic_year
+
+def coptic_to_gregorian(day: int, month: int, coptic_year: int) -> datetime.date:
+    """Convertit une date copte en date grégorienne (arithmétique, O(1))."""
+    return datetime.date.fromordinal(coptic_to_ordinal(day, month, coptic_year))
+
+def gregorian_to_coptic(gdate: datetime.date) -> CopticDate:
     """Convertit une date grégorienne en date copte."""
-    y = gdate.year
-    new_year_day = 12 if is_gregorian_leap(y - 1) else 11
-    cny = datetime.date(y, 9, new_year_day)
-    
-    if gdate >= cny:
-        delta = (gdate - cny).days
-        coptic_year = y - 284
-    else:
-        y_prev = y - 1
-        cny_prev = datetime.date(y_prev, 9, 12 if is_gregorian_leap(y_prev - 1) else 11)
-        delta = (gdate - cny_prev).days
-        coptic_year = y_prev - 284
-        
-    day_abs = delta + 1
-    is_coptic_leap = (coptic_year + 1) % 4 == 0
-    
-    if day_abs <= 360:
-        month = (day_abs - 1) // 30 + 1
-        day = (day_abs - 1) % 30 + 1
-    else: # Mois de Nasi
-        month = 13
-        day = day_abs - 360
-        
-    return {"jour": day, "mois": COPTIC_MONTHS_AR[month - 1], "mois_num": month, "annee_copte": coptic_year}
+    day, month, coptic_year = ordinal_to_coptic(gdate.toordinal())
+    return CopticDate(coptic_year, month, day)
 
 def julian_easter(year: int) -> datetime.date:
     """Calcule la date de Pâques dans le calendrier Julien."""
@@ -49,7 +69,7 @@ def julian_easter(year: int) -> datetime.date:
     c = year % 19
     d = (19 * c + 15) % 30
     e = (2 * a + 4 * b - d + 34) % 7
-    month = 3 + (d + e + 114) // 31
+    month = (d + e + 114) // 31
     day = ((d + e + 114) % 31) + 1
     return datetime.date(year, month, day)
 
@@ -65,15 +85,37 @@ def coptic_pascha_date(year: int) -> datetime.date:
     return julian_to_gregorian(jd)
 
 def locate_fixed_coptic(day: int, month: int, year_guess: int) -> datetime.date:
-    """Trouve la date grégorienne pour un jour/mois copte donné, autour d'une année pivot."""
+    """Trouve la date grégorienne pour un jour/mois copte donné, autour d'une année pivot.
+
+    Renvoie la première occurrence dans la fenêtre [pivot - 400, pivot + 400] jours,
+    le pivot étant le 1er juin de `year_guess`.
+    """
     pivot = datetime.date(year_guess, 6, 1) # Pivot au milieu de l'année pour plus de stabilité
-    for d in range(-400, 401):
-        g = pivot + datetime.timedelta(days=d)
-        c = gregorian_to_coptic(g)
-        if c["mois_num"] == month and c["jour"] == day:
-            return g
+    lo, hi = pivot.toordinal() - 400, pivot.toordinal() + 400
+    _, _, coptic_year = ordinal_to_coptic(lo)
+    for cy in (coptic_year, coptic_year + 1, coptic_year + 2):
+        try:
+            o = coptic_to_ordinal(day, month, cy)
+        except ValueError:
+            continue
+        if lo <= o <= hi:
+            return datetime.date.fromordinal(o)
     raise ValueError(f"Date coptique introuvable : {day}/{month} autour de {year_guess}")
 
+def next_fixed_coptic(day: int, month: int, start: datetime.date) -> datetime.date:
+    """Première date grégorienne du jour/mois copte donné à partir de `start` (inclus)."""
+    o = start.toordinal()
+    _, _, coptic_year = ordinal_to_coptic(o)
+    # Le 6 Nasi n'existe que les années bissextiles : jusqu'à trois années coptes à essayer
+    for cy in (coptic_year, coptic_year + 1, coptic_year + 2, coptic_year + 3):
+        try:
+            c = coptic_to_ordinal(day, month, cy)
+        except ValueError:
+            continue
+        if c >= o:
+            return datetime.date.fromordinal(c)
+    raise ValueError(f"Date coptique introuvable : {day}/{month} après {start.isoformat()}")
+
 # --- Fonctions de logique métier ---
 
 def load_master(path: str) -> Dict[str, Any]:
@@ -98,107 +140,588 @@ def compute_paramon_days(data: Dict[str, Any], year: int) -> List[Dict[str, Any]
             })
     return results
 
-def get_movable_feasts(data: Dict[str, Any], year: int) -> List[Dict[str, Any]]:
-    """Retourne toutes les fêtes mobiles (Pâques, Paramon) pour une année."""
+def get_movable_feasts(data: Dict[str, Any], year: int) -> List[Feast]:
+    """Retourne toutes les fêtes mobiles (Pâques, Paramon) pour une année, datées."""
     pascha = coptic_pascha_date(year)
-    out = []
-    for f in data["feasts_movable"]:
-        d = pascha + datetime.timedelta(days=f["offset_jours"])
-        nf = f.copy()
-        nf["gregorian_date"] = d
-        out.append(nf)
-    
+    out = [Feast.from_dict(f, pascha + datetime.timedelta(days=f["offset_jours"])) for f in data["feasts_movable"]]
+
     for p in compute_paramon_days(data, year):
-        out.append({
-            "code": p["code"],
-            "gregorian_date": p["gregorian_date"],
-            "rang": "paramon",
-            "titre_ar": "برامون " + ("الميلاد" if p["feast_code"] == "NATIVITY" else "الغطاس"),
-            "titre_fr": "Paramon de la " + ("Nativité" if p["feast_code"] == "NATIVITY" else "Théophanie"),
-            "resume_ar": "يوم إعداد وصوم ترقّبي قبل العيد."
-        })
+        out.append(Feast(
+            code=p["code"],
+            gregorian_date=p["gregorian_date"],
+            rang="paramon",
+            titre_ar="برامون " + ("الميلاد" if p["feast_code"] == "NATIVITY" else "الغطاس"),
+            titre_fr="Paramon de la " + ("Nativité" if p["feast_code"] == "NATIVITY" else "Théophanie"),
+            resume_ar="يوم إعداد وصوم ترقّبي قبل العيد."
+        ))
+    return out
+
+# --- Année liturgique compilée ---
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LiturgicalYear:
+    """Données liturgiques d'une année grégorienne, calculées une seule fois."""
+    year: int
+    pascha: datetime.date
+    movable_feasts: List[Feast]
+    movable_by_date: Dict[datetime.date, Tuple[Feast, ...]]
+    # Périodes chevauchant l'année civile, triées par date de début ; la priorité est l'ordre dans les données
+    fasting_intervals: List[FastingPeriod]
+    fasting_starts: List[datetime.date]
+
+    def movable_on(self, date: datetime.date) -> Tuple[Feast, ...]:
+        """Fêtes mobiles (et Paramon) tombant à cette date."""
+        return self.movable_by_date.get(date, ())
+
+    def in_fifty_days(self, date: datetime.date) -> bool:
+        """Vérifie si la date tombe dans les 50 jours saints."""
+        return 0 <= (date - self.pascha).days <= 49
+
+    def fasting_period_on(self, date: datetime.date) -> Optional[FastingPeriod]:
+        """Renvoie la période de jeûne prioritaire contenant la date, ou None."""
+        best = None
+        for fp in self.fasting_intervals[:bisect.bisect_right(self.fasting_starts, date)]:
+            if date <= fp.fin and (best is None or fp.priorite < best.priorite):
+                best = fp
+        return best
+
+def fasting_period_bounds(fp: Dict[str, Any], year: int) -> List[Tuple[datetime.date, datetime.date]]:
+    """Occurrences (début, fin) d'une période de jeûne pouvant chevaucher l'année civile `year`.
+
+    Un début fixe est pris dans chacune des trois années coptes voisines (un jour copte tombe une
+    fois par année copte, pas toujours une fois par année civile), un début relatif dans les Pâques
+    des années civiles voisines. Une fin fixe est la première occurrence de son jour copte à partir
+    du début ; une fin relative se rapporte à la Pâques du début (ou de son année, pour un début fixe).
+    Les occurrences hors des limites de datetime sont ignorées ; KeyError si la période est mal décrite.
+    """
+    start_ref, end_ref = fp["debut_ref"], fp["fin_ref"]
+    out = []
+    for anchor in (year - 1, year, year + 1):
+        try:
+            if fp["debut_type"] == "relative_to_pascha":
+                pascha = coptic_pascha_date(anchor)
+                start = pascha + datetime.timedelta(days=start_ref["offset"])
+            else:
+                # Année copte commençant en septembre de l'année civile précédant `anchor`
+                start = coptic_to_gregorian(start_ref["jour"], start_ref["mois"], anchor - 284)
+                pascha = coptic_pascha_date(start.year)
+            if fp["fin_type"] == "relative_to_pascha":
+                end = pascha + datetime.timedelta(days=end_ref["offset"])
+            else:
+                end = next_fixed_coptic(end_ref["jour"], end_ref["mois"], start)
+        except (ValueError, OverflowError):
+            continue
+        out.append((start, end))
+    return out
+
+def compile_liturgical_year(data: Dict[str, Any], year: int) -> LiturgicalYear:
+    """Calcule Pâques, les fêtes mobiles, le Paramon et les périodes de jeûne d'une année."""
+    pascha = coptic_pascha_date(year)
+    movable = get_movable_feasts(data, year)
+    by_date: Dict[datetime.date, Tuple[Feast, ...]] = {}
+    for f in movable:
+        by_date[f.gregorian_date] = by_date.get(f.gregorian_date, ()) + (f,)
+
+    first, last = datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+    intervals = []
+    for rank, fp in enumerate(data.get("fasting_periods", [])):
+        if fp["code"] == "FIFTY_DAYS": continue
+        try:
+            bounds = fasting_period_bounds(fp, year)
+        except KeyError:
+            continue
+        for start_date, end_date in bounds:
+            if start_date <= end_date and start_date <= last and end_date >= first:
+                intervals.append(FastingPeriod(start_date, end_date, rank, fp["code"], fp.get("intensite", "normal")))
+    intervals.sort()
+
+    return LiturgicalYear(
+        year=year, pascha=pascha, movable_feasts=movable, movable_by_date=by_date,
+        fasting_intervals=intervals, fasting_starts=[fp.debut for fp in intervals],
+    )
+
+_YEAR_CACHE: "collections.OrderedDict[Tuple[int, int], Tuple[Dict[str, Any], LiturgicalYear]]" = collections.OrderedDict()
+_YEAR_CACHE_LOCK = threading.Lock()
+_YEAR_CACHE_STATS = {"hits": 0, "misses": 0}
+# id() des dernières données retirées par forget_data : les calculs encore en cours sur ces
+# données ne les remettent pas en cache (un id est réattribué au chargement, via attach_day_index)
+_FORGOTTEN: Dict[int, None] = {}
+
+def liturgical_year(data: Dict[str, Any], year: int) -> LiturgicalYear:
+    """Renvoie l'année liturgique compilée, depuis le cache LRU si possible."""
+    key = (id(data), year)
+    with _YEAR_CACHE_LOCK:
+        entry = _YEAR_CACHE.get(key)
+        # On vérifie l'identité des données : un id() peut être réutilisé après libération
+        if entry is not None and entry[0] is data:
+            _YEAR_CACHE.move_to_end(key)
+            _YEAR_CACHE_STATS["hits"] += 1
+            return entry[1]
+        _YEAR_CACHE_STATS["misses"] += 1
+
+    ly = compile_liturgical_year(data, year)
+    with _YEAR_CACHE_LOCK:
+        if id(data) in _FORGOTTEN:
+            return ly
+        _YEAR_CACHE[key] = (data, ly)
+        _YEAR_CACHE.move_to_end(key)
+        while len(_YEAR_CACHE) > YEAR_CACHE_SIZE:
+            _YEAR_CACHE.popitem(last=False)
+    return ly
+
+def year_cache_info() -> Dict[str, int]:
+    """Compteurs du cache des années liturgiques (pour dimensionner YEAR_CACHE_SIZE)."""
+    with _YEAR_CACHE_LOCK:
+        return {**_YEAR_CACHE_STATS, "size": len(_YEAR_CACHE), "maxsize": YEAR_CACHE_SIZE}
+
+def clear_year_cache() -> None:
+    """Vide le cache des années liturgiques et remet les compteurs à zéro."""
+    with _YEAR_CACHE_LOCK:
+        _YEAR_CACHE.clear()
+        _YEAR_CACHE_STATS.update(hits=0, misses=0)
+
+# --- Index des jours coptes ---
+
+class DayIndex:
+    """Table compilée (mois, jour) coptes -> fêtes fixes et saints commémorés.
+
+    Une cellule par jour copte (13 mois × 30 jours, le Nasi n'utilisant que les 6 premiers) ;
+    les fêtes fixes avec `mois_copte: 0` sont des récurrences mensuelles et sont recopiées
+    dans chaque mois. La recherche d'un jour coûte O(1) quelle que soit la taille du catalogue.
+    """
+    __slots__ = ("feasts", "saints")
+
+    def __init__(self, feasts: List[Tuple[Feast, ...]], saints: List[Tuple[Saint, ...]]):
+        self.feasts = feasts
+        self.saints = saints
+
+    def lookup(self, month: int, day: int) -> Tuple[Tuple[Feast, ...], Tuple[Saint, ...]]:
+        """Renvoie (fêtes fixes, saints) du jour copte, dans l'ordre des données."""
+        i = (month - 1) * 30 + day - 1
+        return self.feasts[i], self.saints[i]
+
+def fixed_feast_days(data: Dict[str, Any]) -> Iterator[Tuple[Tuple[int, ...], int, Dict[str, Any]]]:
+    """(mois coptes, jour, fête) de chaque fête fixe valide, dans l'ordre des données."""
+    for f in data.get("feasts_fixed", []):
+        day, month = f.get("jour_copte") or 0, f.get("mois_copte")
+        if not 1 <= day <= 30:
+            continue
+        # mois_copte 0 : fête mensuelle, recopiée dans chaque mois
+        if month == 0:
+            yield tuple(range(1, 14)), day, f
+        elif month and 1 <= month <= 13:
+            yield (month,), day, f
+
+def compile_day_index(data: Dict[str, Any]) -> DayIndex:
+    """Construit l'index des jours coptes à partir des données maîtres."""
+    feasts: List[List[Feast]] = [[] for _ in range(13 * 30)]
+    for months, day, f in fixed_feast_days(data):
+        feast = Feast.from_dict(f)
+        for m in months:
+            feasts[(m - 1) * 30 + day - 1].append(feast)
+
+    saints_by_id = {s["id"]: Saint.from_dict(s) for s in data.get("saints", [])}
+    saints: List[List[Saint]] = [[] for _ in range(13 * 30)]
+    for comm in data.get("daily_commemorations", []):
+        day, month = comm["jour_copte"], comm["mois_copte"]
+        if 1 <= month <= 13 and 1 <= day <= 30:
+            saints[(month - 1) * 30 + day - 1].extend(saints_by_id[i] for i in comm["liste_saints"] if i in saints_by_id)
+
+    return DayIndex([tuple(c) for c in feasts], [tuple(c) for c in saints])
+
+_DAY_INDEXES: Dict[int, Tuple[Dict[str, Any], DayIndex]] = {}
+_DAY_INDEX_LOCK = threading.Lock()
+
+def day_index(data: Dict[str, Any]) -> DayIndex:
+    """Renvoie l'index des jours coptes de ces données, compilé au premier appel."""
+    entry = _DAY_INDEXES.get(id(data))
+    if entry is not None and entry[0] is data:
+        return entry[1]
+    index = compile_day_index(data)
+    if id(data) in _FORGOTTEN:
+        return index
+    with _DAY_INDEX_LOCK:
+        _store_day_index(data, index)
+    return index
+
+def forget_data(data: Dict[str, Any]) -> None:
+    """Retire des caches (années liturgiques, index des jours, occurrences) tout ce qui dépend de ces données.
+
+    Elles n'y sont plus ajoutées ensuite, sauf si elles sont de nouveau chargées (attach_day_index).
+    """
+    with _YEAR_CACHE_LOCK:
+        _FORGOTTEN[id(data)] = None
+        while len(_FORGOTTEN) > 16:
+            _FORGOTTEN.pop(next(iter(_FORGOTTEN)))
+        for key in [k for k, (d, _) in _YEAR_CACHE.items() if d is data]:
+            del _YEAR_CACHE[key]
+    with _DAY_INDEX_LOCK:
+        for cache in (_DAY_INDEXES, _OCCURRENCE_TABLES):
+            entry = cache.get(id(data))
+            if entry is not None and entry[0] is data:
+                del cache[id(data)]
+
+def _store_day_index(data: Dict[str, Any], index: DayIndex) -> None:
+    # Peu de jeux de données coexistent : on ne garde que les plus récents
+    while len(_DAY_INDEXES) >= 4:
+        _DAY_INDEXES.pop(next(iter(_DAY_INDEXES)))
+    _DAY_INDEXES[id(data)] = (data, index)
+
+def attach_day_index(data: Dict[str, Any], index: DayIndex) -> DayIndex:
+    """Enregistre des données qui viennent d'être chargées, avec leur index (compilé ou lu d'un snapshot)."""
+    with _YEAR_CACHE_LOCK:
+        # Un id libéré peut être réattribué à de nouvelles données
+        _FORGOTTEN.pop(id(data), None)
+    with _DAY_INDEX_LOCK:
+        _store_day_index(data, index)
+    return index
+
+# --- Table des occurrences (fêtes et périodes de jeûne) ---
+
+# Les années sont compilées par blocs alignés de cette taille, au fil des requêtes
+OCCURRENCE_CHUNK_YEARS = int(os.environ.get("OCCURRENCE_CHUNK_YEARS", "50"))
+OCCURRENCE_MIN_YEAR, OCCURRENCE_MAX_YEAR = MIN_YEAR, MAX_YEAR
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class OccurrenceChunk:
+    """Occurrences compilées pour les années [first, last]."""
+    first: int
+    last: int
+    # Dates triées par code de fête (fixe, mobile, Paramon, PASCHA)
+    feasts: Dict[str, List[datetime.date]]
+    # Périodes de jeûne débutant dans ces années, triées par début, par code et par intensité
+    by_code: Dict[str, Tuple[List[datetime.date], List[FastingPeriod]]]
+    by_intensity: Dict[str, Tuple[List[datetime.date], List[FastingPeriod]]]
+
+def _period_series(periods: List[FastingPeriod], key: Callable[[FastingPeriod], str]) -> Dict[str, Tuple[List[datetime.date], List[FastingPeriod]]]:
+    out: Dict[str, Tuple[List[datetime.date], List[FastingPeriod]]] = {}
+    for fp in periods:
+        starts, items = out.setdefault(key(fp), ([], []))
+        starts.append(fp.debut)
+        items.append(fp)
     return out
 
-def fasting_state(date: datetime.date, data: Dict[str, Any], todays_feasts_codes: set) -> Dict[str, Any]:
-    """Détermine le statut de jeûne pour une date donnée."""
+class OccurrenceTable:
+    """Dates de chaque fête et bornes de chaque période de jeûne, triées par code.
+
+    Les années sont compilées à la demande par blocs alignés de OCCURRENCE_CHUNK_YEARS ;
+    une requête est alors une bisection sur le tableau du code dans chaque bloc concerné.
+    Les occurrences sont celles que donne compute_day : une fête fixe tombe aux dates
+    grégoriennes de son jour copte, une fête mobile n'est comptée que dans l'année civile
+    dont elle dépend, et une période de jeûne est celle des années liturgiques compilées
+    (vérifié par scripts/check_occurrences.py).
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self._fixed = [(m, day, f["code"]) for months, day, f in fixed_feast_days(data) for m in months]
+        fasting = data.get("fasting_periods", [])
+        self.feast_codes = ({code for _, _, code in self._fixed} | {f["code"] for f in data.get("feasts_movable", [])}
+                            | set(data.get("paramon_rules", {})) | {"PASCHA"})
+        self.fast_codes = {fp["code"] for fp in fasting}
+        self.intensities = {fp.get("intensite", "normal") for fp in fasting}
+        self._fifty = next(((rank, fp.get("intensite", "normal")) for rank, fp in enumerate(fasting) if fp["code"] == "FIFTY_DAYS"), None)
+        self._chunks: Dict[int, OccurrenceChunk] = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, first: int, last: int) -> OccurrenceChunk:
+        """Occurrences des années [first, last]."""
+        feasts: Dict[str, List[datetime.date]] = collections.defaultdict(list)
+        # Chaque année liturgique contient les périodes chevauchant son année civile, donc celles qui y débutent
+        years = {y: compile_liturgical_year(self.data, y) for y in range(first, last + 1)}
+        for year in range(first, last + 1):
+            ly = years[year]
+            lo, hi = datetime.date(year, 1, 1).toordinal(), datetime.date(year, 12, 31).toordinal()
+            # L'année civile chevauche deux années coptes (changement vers le 11 septembre)
+            for cy in (year - 284, year - 283):
+                for month, day, code in self._fixed:
+                    if day <= coptic_days_in_month(month, cy):
+                        o = coptic_to_ordinal(day, month, cy)
+                        if lo <= o <= hi:
+                            feasts[code].append(datetime.date.fromordinal(o))
+            feasts["PASCHA"].append(ly.pascha)
+            for f in ly.movable_feasts:
+                if f.gregorian_date.year == year:
+                    feasts[f.code].append(f.gregorian_date)
+
+        periods = set()
+        for ly in years.values():
+            intervals = list(ly.fasting_intervals)
+            if self._fifty is not None:
+                intervals.append(FastingPeriod(ly.pascha, ly.pascha + datetime.timedelta(days=49), self._fifty[0], "FIFTY_DAYS", self._fifty[1]))
+            periods.update(fp for fp in intervals if first <= fp.debut.year <= last)
+        ordered = sorted(periods)
+        return OccurrenceChunk(first, last, {code: sorted(set(dates)) for code, dates in feasts.items()},
+                               _period_series(ordered, lambda fp: fp.code), _period_series(ordered, lambda fp: fp.intensite))
+
+    def chunk(self, year: int) -> OccurrenceChunk:
+        """Bloc d'années contenant `year` (compilé au premier accès)."""
+        k = year // OCCURRENCE_CHUNK_YEARS
+        chunk = self._chunks.get(k)
+        if chunk is not None:
+            return chunk
+        with self._lock:
+            chunk = self._chunks.get(k)
+            if chunk is None:
+                first = max(OCCURRENCE_MIN_YEAR, k * OCCURRENCE_CHUNK_YEARS)
+                last = min(OCCURRENCE_MAX_YEAR, (k + 1) * OCCURRENCE_CHUNK_YEARS - 1)
+                chunk = self._chunks[k] = self._compile(first, last)
+            return chunk
+
+    def kind(self, code: str) -> Optional[str]:
+        """"feast" ou "fast" selon le code, None s'il est inconnu."""
+        if code in self.feast_codes:
+            return "feast"
+        if code in self.fast_codes:
+            return "fast"
+        return None
+
+    @staticmethod
+    def _series(chunk: OccurrenceChunk, kind: str, key: str) -> Tuple[List[datetime.date], List[Any]]:
+        if kind == "feast":
+            dates = chunk.feasts.get(key, [])
+            return dates, dates
+        return (chunk.by_code if kind == "fast" else chunk.by_intensity).get(key, ([], []))
+
+    def next_after(self, kind: str, key: str, after: datetime.date) -> Any:
+        """Première occurrence strictement après `after` (date, ou FastingPeriod pour un jeûne), ou None.
+
+        `kind` : "feast", "fast" (code de période) ou "intensity" (intensité de période).
+        La recherche s'arrête OCCURRENCE_CHUNK_YEARS ans après `after`.
+        """
+        year = max(after.year, OCCURRENCE_MIN_YEAR)
+        while year <= min(after.year + OCCURRENCE_CHUNK_YEARS, OCCURRENCE_MAX_YEAR):
+            chunk = self.chunk(year)
+            starts, items = self._series(chunk, kind, key)
+            i = bisect.bisect_right(starts, after)
+            if i < len(starts):
+                return items[i]
+            year = chunk.last + 1
+        return None
+
+    def between(self, kind: str, key: str, start: datetime.date, end: datetime.date) -> List[Any]:
+        """Occurrences (dates, ou périodes par date de début) de `start` à `end` inclus."""
+        out: List[Any] = []
+        year = max(start.year, OCCURRENCE_MIN_YEAR)
+        while year <= min(end.year, OCCURRENCE_MAX_YEAR):
+            chunk = self.chunk(year)
+            starts, items = self._series(chunk, kind, key)
+            out += items[bisect.bisect_left(starts, start):bisect.bisect_right(starts, end)]
+            year = chunk.last + 1
+        return out
+
+    def info(self) -> Dict[str, int]:
+        """Blocs compilés et nombre d'occurrences qu'ils contiennent (pour /health)."""
+        chunks = list(self._chunks.values())
+        return {"chunks": len(chunks), "dates": sum(len(d) for c in chunks for d in c.feasts.values()),
+                "periods": sum(len(items) for c in chunks for _, items in c.by_code.values())}
+
+_OCCURRENCE_TABLES: Dict[int, Tuple[Dict[str, Any], OccurrenceTable]] = {}
+
+def occurrence_table(data: Dict[str, Any]) -> OccurrenceTable:
+    """Renvoie la table des occurrences de ces données (vide à la création, étendue à la demande)."""
+    entry = _OCCURRENCE_TABLES.get(id(data))
+    if entry is not None and entry[0] is data:
+        return entry[1]
+    with _DAY_INDEX_LOCK:
+        entry = _OCCURRENCE_TABLES.get(id(data))
+        if entry is not None and entry[0] is data:
+            return entry[1]
+        table = OccurrenceTable(data)
+        if id(data) in _FORGOTTEN:
+            return table
+        while len(_OCCURRENCE_TABLES) >= 4:
+            _OCCURRENCE_TABLES.pop(next(iter(_OCCURRENCE_TABLES)))
+        _OCCURRENCE_TABLES[id(data)] = (data, table)
+        return table
+
+def fasting_state(date: datetime.date, data: Dict[str, Any], todays_feasts_codes: set, ly: Optional[LiturgicalYear] = None) -> FastingStatus:
+    """Détermine le statut de jeûne pour une date donnée (`ly` : année liturgique déjà résolue, optionnelle)."""
     # Règle 1: Le jeûne du Paramon a une haute priorité.
     if PARAMON_CODES & todays_feasts_codes:
-        return {"est_jeune": True, "type": "PARAMON", "intensite": "strict", "source_rule": "PARAMON"}
+        return FAST_PARAMON
 
     # Règle 2: Les fêtes seigneuriales majeures annulent tout jeûne.
     if MAJOR_FEAST_CODES & todays_feasts_codes:
-        return {"est_jeune": False, "type": None, "intensite": "none", "source_rule": "MAJOR_FEAST_OVERRIDE"}
+        return FAST_MAJOR_FEAST
 
     # Règle 3: Pas de jeûne durant les 50 jours saints (Khamasin).
-    pascha = coptic_pascha_date(date.year)
-    if pascha <= date <= pascha + datetime.timedelta(days=49):
-        return {"est_jeune": False, "type": None, "intensite": "none", "source_rule": "FIFTY_DAYS"}
+    if ly is None:
+        ly = liturgical_year(data, date.year)
+    if ly.in_fifty_days(date):
+        return FAST_FIFTY_DAYS
 
-    # Règle 4: Scanner les périodes de jeûne définies.
-    for fp in data.get("fasting_periods", []):
-        if fp["code"] == "FIFTY_DAYS": continue
-        try:
-            start_date = pascha + datetime.timedelta(days=fp["debut_ref"]["offset"]) if fp["debut_type"] == "relative_to_pascha" else locate_fixed_coptic(fp["debut_ref"]["jour"], fp["debut_ref"]["mois"], date.year)
-            end_date = pascha + datetime.timedelta(days=fp["fin_ref"]["offset"]) if fp["fin_type"] == "relative_to_pascha" else locate_fixed_coptic(fp["fin_ref"]["jour"], fp["fin_ref"]["mois"], date.year)
-            if start_date <= date <= end_date:
-                return {"est_jeune": True, "type": fp["code"], "intensite": fp.get("intensite", "normal"), "source_rule": fp["code"]}
-        except (ValueError, KeyError):
-            continue
+    # Règle 4: Périodes de jeûne définies (intervalles pré-calculés pour l'année).
+    fp = ly.fasting_period_on(date)
+    if fp is not None:
+        return FastingStatus(True, fp.code, fp.intensite, fp.code)
 
     # Règle 5: Jeûne du Mercredi et Vendredi.
     if date.weekday() in (2, 4):
-        return {"est_jeune": True, "type": "WED_FRI", "intensite": "normal", "source_rule": "WED_FRI"}
+        return FAST_WED_FRI
 
-    return {"est_jeune": False, "type": None, "intensite": "none", "source_rule": "NONE"}
+    return FAST_NONE
 
 # --- Fonctions de construction de la réponse ---
 
-def build_day(data: Dict[str, Any], date: datetime.date, lang: str = "ar") -> Dict[str, Any]:
-    """Construit l'objet de réponse complet pour un jour."""
-    cinfo = gregorian_to_coptic(date)
+def compute_day(data: Dict[str, Any], date: datetime.date) -> DayRecord:
+    """Calcule les données liturgiques d'un jour (indépendantes de la langue)."""
+    hook = STAGE_HOOK
+    t = time.perf_counter() if hook else 0.0
+    cdate = gregorian_to_coptic(date)
+    if hook: t = hook("conversion", t)
     
-    # Pré-calcul des fêtes du jour
-    fixed = [f for f in data["feasts_fixed"] if (f.get("jour_copte") == cinfo["jour"] and f.get("mois_copte") == cinfo["mois_num"]) or (f["code"] == "ARCHANGEL_MICHAEL_MONTHLY" and cinfo["jour"] == 12)]
+    # Fêtes fixes et saints du jour copte, depuis l'index compilé
+    fixed, saints = day_index(data).lookup(cdate.mois_num, cdate.jour)
+    if hook: t = hook("saints", t)
     
-    all_movable = get_movable_feasts(data, date.year)
-    movable = [f for f in all_movable if f["gregorian_date"] == date]
+    ly = liturgical_year(data, date.year)
+    movable = ly.movable_on(date)
+    if hook: t = hook("movable_feasts", t)
     
-    todays_feasts_codes = {f["code"] for f in fixed} | {f["code"] for f in movable}
+    todays_feasts_codes = {f.code for f in fixed} | {f.code for f in movable}
     
     # Logique principale
     fast = fasting_state(date, data, todays_feasts_codes)
     
-    pascha = coptic_pascha_date(date.year)
-    period = "الخماسين المقدسة" if pascha <= date <= pascha + datetime.timedelta(days=49) else "عادي"
+    period = "الخماسين المقدسة" if ly.in_fifty_days(date) else "عادي"
+    if hook: hook("fasting", t)
 
-    def get_lang_field(obj, field_prefix):
-        return obj.get(f"{field_prefix}_{lang}", obj.get(f"{field_prefix}_ar", ""))
+    return DayRecord(date, cdate, period, fast, fixed + movable, saints)
 
-    feasts_res = [{
-        "code": f["code"], "titre": get_lang_field(f, "titre"), "resume": get_lang_field(f, "resume"), "rang": f.get("rang")
-    } for f in fixed + movable]
-    
-    # Correction de la logique pour trouver les saints
-    saints_ids_today = []
-    for comm in data.get("daily_commemorations", []):
-        if comm["jour_copte"] == cinfo["jour"] and comm["mois_copte"] == cinfo["mois_num"]:
-            saints_ids_today.extend(comm["liste_saints"])
-            
-    saints_by_id = {s['id']: s for s in data.get("saints", [])}
-    
-    commems_res = []
-    for saint_id in saints_ids_today:
-        saint = saints_by_id.get(saint_id)
-        if saint:
-            commems_res.append({
-                "id": saint["id"], 
-                "type": saint.get("type"), 
-                "nom": get_lang_field(saint, "nom"), 
-                "resume": get_lang_field(saint, "resume"), 
-                "fiabilite": saint.get("fiabilite", "moyenne")
-            })
+def build_day(data: Dict[str, Any], date: datetime.date, lang: str = "ar") -> Dict[str, Any]:
+    """Construit l'objet de réponse complet pour un jour."""
+    record = compute_day(data, date)
+    hook = STAGE_HOOK
+    t = time.perf_counter() if hook else 0.0
+    out = record.to_dict(lang)
+    if hook: hook("serialization", t)
+    return out
+
+def compute_days(data: Dict[str, Any], dates: List[datetime.date]) -> List[DayRecord]:
+    """Calcule des jours quelconques, dans l'ordre demandé.
+
+    Les dates sont regroupées par année : l'année liturgique et l'index des jours ne sont
+    résolus qu'une fois par groupe, et une date répétée n'est calculée qu'une fois.
+    """
+    index = day_index(data)
+    by_year: Dict[int, List[datetime.date]] = {}
+    for d in dict.fromkeys(dates):
+        by_year.setdefault(d.year, []).append(d)
+
+    records: Dict[datetime.date, DayRecord] = {}
+    for year, days in by_year.items():
+        ly = liturgical_year(data, year)
+        for d in days:
+            cdate = gregorian_to_coptic(d)
+            fixed, saints = index.lookup(cdate.mois_num, cdate.jour)
+            feasts = fixed + ly.movable_on(d)
+            fast = fasting_state(d, data, {f.code for f in feasts}, ly)
+            period = "الخماسين المقدسة" if ly.in_fifty_days(d) else "عادي"
+            records[d] = DayRecord(d, cdate, period, fast, feasts, saints)
+    return [records[d] for d in dates]
+
+def build_days(data: Dict[str, Any], dates: List[datetime.date], lang: str = "ar",
+               fields: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+    """Réponses journalières de dates quelconques, dans l'ordre demandé (voir compute_days)."""
+    return [r.to_dict(lang, fields) for r in compute_days(data, dates)]
+
+def compute_range(data: Dict[str, Any], start: datetime.date, end: datetime.date) -> List[DayRecord]:
+    """Calcule les jours de `start` à `end` inclus, en un seul balayage.
+
+    Le résultat est identique à un appel de compute_day pour chaque jour, mais le travail
+    par année (fêtes mobiles, jeûnes) et par jour copte n'est fait qu'une fois.
+    """
+    n = (end - start).days + 1
+    if n <= 0:
+        return []
+    index = day_index(data)
+    base = start.toordinal()
+
+    # 1. Peindre les règles de jeûne 3 à 5 sur un tableau de jours, de la plus faible à la plus forte priorité
+    fasts: List[FastingStatus] = [FAST_WED_FRI if (start.weekday() + i) % 7 in (2, 4) else FAST_NONE for i in range(n)]
+    fifty = [False] * n
+    for year in range(start.year, end.year + 1):
+        ly = liturgical_year(data, year)
+        lo = max(start, datetime.date(year, 1, 1)).toordinal() - base
+        hi = min(end, datetime.date(year, 12, 31)).toordinal() - base
+        for fp in sorted(ly.fasting_intervals, key=lambda fp: -fp.priorite):
+            status = FastingStatus(True, fp.code, fp.intensite, fp.code)
+            for i in range(max(lo, fp.debut.toordinal() - base), min(hi, fp.fin.toordinal() - base) + 1):
+                fasts[i] = status
+        p = ly.pascha.toordinal() - base
+        for i in range(max(lo, p), min(hi, p + 49) + 1):
+            fasts[i] = FAST_FIFTY_DAYS
+            fifty[i] = True
+
+    # 2. Émettre les jours en avançant la date copte au lieu de la reconvertir
+    cday, cmonth, cyear = ordinal_to_coptic(base)
+    out = []
+    ly = None
+    for i in range(n):
+        date = datetime.date.fromordinal(base + i)
+        if ly is None or ly.year != date.year:
+            ly = liturgical_year(data, date.year)
+
+        fixed, saints = index.lookup(cmonth, cday)
+        feasts = fixed + ly.movable_on(date)
+        codes = {f.code for f in feasts}
+        # Règles 1 et 2 : Paramon puis fêtes seigneuriales majeures
+        if PARAMON_CODES & codes:
+            fast = FAST_PARAMON
+        elif MAJOR_FEAST_CODES & codes:
+            fast = FAST_MAJOR_FEAST
+        else:
+            fast = fasts[i]
+        period = "الخماسين المقدسة" if fifty[i] else "عادي"
+
+        out.append(DayRecord(date, CopticDate(cyear, cmonth, cday), period, fast, feasts, saints))
+
+        cday += 1
+        if cday > coptic_days_in_month(cmonth, cyear):
+            cday = 1
+            cmonth += 1
+            if cmonth > 13:
+                cmonth = 1
+                cyear += 1
+    return out
+
+def build_range(data: Dict[str, Any], start: datetime.date, end: datetime.date, lang: str = "ar") -> List[Dict[str, Any]]:
+    """Construit les réponses journalières de `start` à `end` inclus (voir compute_range)."""
+    return [r.to_dict(lang) for r in compute_range(data, start, end)]
+
+def iter_range(data: Dict[str, Any], start: datetime.date, end: datetime.date) -> Iterator[DayRecord]:
+    """Générateur des jours de `start` à `end` inclus, calculés une année civile à la fois.
+
+    La mémoire reste bornée par une année, quelle que soit la longueur de la plage.
+    """
+    while start <= end:
+        chunk_end = min(end, datetime.date(start.year, 12, 31))
+        yield from compute_range(data, start, chunk_end)
+        if chunk_end == end:
+            return
+        start = chunk_end + datetime.timedelta(days=1)
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Analyse une liste de champs séparés par des virgules (None ou vide : tous les champs)."""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in DAY_FIELDS]
+    if unknown:
+        raise ValueError(f"Champs inconnus : {', '.join(unknown)}. Champs disponibles : {', '.join(DAY_FIELDS)}.")
+    return names or None
+
+def iter_days(data: Dict[str, Any], start: datetime.date, end: datetime.date, lang: str = "ar",
+              fields: Optional[Tuple[str, ...]] = None) -> Iterator[Dict[str, Any]]:
+    """Réponses journalières de `start` à `end` en flux, restreintes aux champs `fields` si donnés."""
+    for record in iter_range(data, start, end):
+        yield record.to_dict(lang, fields)
+
+def build_week(data: Dict[str, Any], start: datetime.date, lang: str = "ar") -> List[Dict[str, Any]]:
+    """Construit les réponses des 7 jours à partir de `start`."""
+    return build_range(data, start, start + datetime.timedelta(days=6), lang)
 
-    return {
-        "date_gregorienne": date.isoformat(), "date_copte": cinfo, "periode_liturgique": period,
-        "jeune": fast, "fetes": feasts_res, "commemorations": commems_res,
-    }
+def build_year_cache(data: Dict[str, Any], year: int, lang: str = "ar") -> List[Dict[str, Any]]:
+    """Construit les réponses de tous les jours d'une année grégorienne."""
+    return build_range(data, datetime.date(year, 1, 1), datetime.date(year, 12, 31), lang)
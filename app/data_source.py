@@ -0,0 +1,335 @@
+# app/data_source.py
+import collections, contextlib, dataclasses, datetime, hashlib, json, logging, os, pathlib, threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from . import calendar_core as cc
+from . import search_index
+from . import snapshot
+from . import validation
+from .models import Feast, Saint
+
+try:
+    import psycopg2.pool
+except ImportError:  # optionnel : seul le backend Postgres en a besoin
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Dataset:
+    """Jeu de données servi par l'API : remplacé d'un bloc lors d'un rechargement, jamais modifié en place."""
+    data: Dict[str, Any]
+    search_index: Dict[str, Any]
+    source: str
+    version: Optional[str]
+    # Identifie le contenu exact (version + empreinte) : clé des caches de réponses et des ETags
+    revision: str
+
+# --- Index des jours chargé à la demande ---
+
+class LazyDayIndex:
+    """Index des jours coptes dont les saints sont chargés à la demande, cellule par cellule.
+
+    Même interface que calendar_core.DayIndex. Les fêtes fixes (peu nombreuses) sont compilées
+    en mémoire ; les saints d'un jour copte sont lus (en base ou dans le snapshot) au premier
+    accès puis gardés dans un cache LRU borné à `max_cells` jours.
+    """
+
+    def __init__(self, feasts: cc.DayIndex, load_saints, max_cells: int):
+        self._feasts = feasts
+        self._load_saints = load_saints
+        self.max_cells = max_cells
+        self._cells: "collections.OrderedDict[Tuple[int, int], Tuple[Saint, ...]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def lookup(self, month: int, day: int) -> Tuple[Tuple[Feast, ...], Tuple[Saint, ...]]:
+        feasts = self._feasts.lookup(month, day)[0]
+        key = (month, day)
+        with self._lock:
+            saints = self._cells.get(key)
+            if saints is not None:
+                self._cells.move_to_end(key)
+                self._stats["hits"] += 1
+                return feasts, saints
+            self._stats["misses"] += 1
+        saints = self._load_saints(month, day)
+        with self._lock:
+            self._cells[key] = saints
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+        return feasts, saints
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "size": len(self._cells), "maxsize": self.max_cells}
+
+# --- Backend JSON ---
+
+class JsonSource:
+    """Données maîtres en mémoire, depuis le snapshot pré-compilé s'il est à jour, sinon depuis le JSON.
+
+    Le JSON est validé (schéma s'il existe, cohérence des références) avant d'être servi ; un snapshot
+    l'a été à sa compilation, et n'est servi que si ces vérifications n'ont pas changé depuis. Les
+    saints d'un snapshot restent dans le fichier projeté en mémoire et sont lus jour par jour (LazyDayIndex).
+    La date de modification et la taille du fichier servent d'empreinte pour détecter un changement.
+    """
+    kind = "json"
+
+    def __init__(self, data_path: str, snapshot_path: str, schema_path: Optional[str] = None, day_cache_cells: int = 390):
+        self.data_path = data_path
+        self.snapshot_path = snapshot_path
+        self.schema_path = schema_path
+        self.day_cache_cells = day_cache_cells
+        self._index: Optional[LazyDayIndex] = None
+        self._validator: Optional[validation.DataValidator] = None
+        # État de la dernière validation : au rechargement, seules les sections modifiées sont revérifiées
+        self._validation_state: Optional[Dict[str, Any]] = None
+
+    def fingerprint(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.data_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def validator(self) -> validation.DataValidator:
+        """Validateur compilé au premier usage (sans fichier de schéma : vérifications référentielles seules)."""
+        if self._validator is None:
+            has_schema = self.schema_path is not None and os.path.exists(self.schema_path)
+            self._validator = validation.DataValidator.from_file(self.schema_path if has_schema else None)
+        return self._validator
+
+    def validate(self, data: Dict[str, Any]) -> None:
+        """Lève ValueError si les données ont des erreurs (état repris d'un chargement à l'autre)."""
+        report = self.validator().run(data, self._validation_state)
+        self._validation_state = report.state
+        report.raise_for_errors()
+
+    def load(self) -> Dataset:
+        snap = snapshot.load_snapshot(self.snapshot_path, self.data_path)
+        if snap is not None and snap["header"].get("validated") != self.validator().signature:
+            # Les saints n'y sont plus sous forme de données à revalider : le JSON fait foi
+            logger.info("Snapshot %s compilé avec d'autres vérifications : chargement depuis le JSON", self.snapshot_path)
+            snap = None
+        if snap is not None:
+            # Le snapshot correspond octet pour octet au JSON courant (empreinte vérifiée au chargement)
+            data, sha = snap["data"], snap["header"]["source_sha256"]
+            index = LazyDayIndex(cc.compile_day_index(data), snap["saints"].on, self.day_cache_cells)
+            cc.attach_day_index(data, index)
+            self._index = index
+            return Dataset(data, snap["search_index"], "snapshot", data.get("version"), f"{data.get('version')}+{sha[:12]}")
+
+        source = pathlib.Path(self.data_path).read_bytes()
+        data = json.loads(source)
+        self.validate(data)
+        # Index de recherche et index des jours coptes (fêtes fixes, saints) construits au chargement
+        idx = search_index.build_indices(data)
+        cc.attach_day_index(data, cc.compile_day_index(data))
+        self._index = None
+        sha = hashlib.sha256(source).hexdigest()
+        return Dataset(data, idx, "json", data.get("version"), f"{data.get('version')}+{sha[:12]}")
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.kind, "path": self.data_path,
+                "day_cache": self._index.info() if self._index is not None else None}
+
+# --- Backend Postgres ---
+
+def _json_value(v: Any) -> Any:
+    # Colonnes json/jsonb décodées par psycopg2, colonnes text à décoder ici
+    return json.loads(v) if isinstance(v, str) else v
+
+def _in_data_order(rows: List[Dict[str, Any]], keys: List[str], key: str) -> List[Dict[str, Any]]:
+    """Remet les lignes dans l'ordre des données (`keys` : clés texte enregistrées par scripts/import_data.py).
+
+    Les lignes absentes de `keys` (conservées par un import précédent) suivent, dans l'ordre de la requête.
+    """
+    position = {k: i for i, k in enumerate(keys)}
+    return sorted(rows, key=lambda r: position.get(str(r[key]), len(position)))
+
+class PostgresSource:
+    """Données maîtres lues dans la base remplie par scripts/import_data.py, via un pool de connexions.
+
+    Les tables de configuration (fêtes, jeûnes, Paramon) sont chargées en mémoire ; les saints
+    d'un jour sont lus via (mois_copte, jour_copte) et gardés dans un cache local (LazyDayIndex).
+    La version et l'empreinte du contenu importé (table master_meta) servent à détecter un nouvel
+    import ; une modification des tables faite hors de scripts/import_data.py n'est pas détectée.
+    """
+    kind = "postgres"
+
+    def __init__(self, dsn: str, min_conn: int = 1, max_conn: int = 8, day_cache_cells: int = 390):
+        if psycopg2 is None:
+            raise RuntimeError("Le backend 'postgres' nécessite le paquet 'psycopg2' (pip install psycopg2-binary).")
+        self.pool = psycopg2.pool.ThreadedConnectionPool(min_conn, max_conn, dsn)
+        self.day_cache_cells = day_cache_cells
+        self._index: Optional[LazyDayIndex] = None
+
+    @contextlib.contextmanager
+    def cursor(self):
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.rollback()  # lectures seules : ne pas laisser de transaction ouverte
+        finally:
+            self.pool.putconn(conn)
+
+    def fingerprint(self) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Version et empreinte du contenu importés (master_meta) : changent à chaque import de données modifiées."""
+        with self.cursor() as cur:
+            cur.execute("SELECT key, value FROM master_meta WHERE key IN ('version', 'content_sha256');")
+            meta = dict(cur.fetchall())
+        return (meta.get("version"), meta.get("content_sha256")) if meta else None
+
+    def load(self) -> Dataset:
+        with self.cursor() as cur:
+            cur.execute("SELECT key, value FROM master_meta;")
+            meta = dict(cur.fetchall())
+            cur.execute("SELECT code, jour_copte, mois_copte, rang, titre_ar, titre_fr FROM feasts_fixed ORDER BY code;")
+            fixed = [dict(zip(("code", "jour_copte", "mois_copte", "rang", "titre_ar", "titre_fr"), r)) for r in cur.fetchall()]
+            cur.execute("SELECT code, offset_jours, rang, titre_ar, titre_fr FROM feasts_movable ORDER BY code;")
+            movable = [dict(zip(("code", "offset_jours", "rang", "titre_ar", "titre_fr"), r)) for r in cur.fetchall()]
+            cur.execute("SELECT code, debut_type, debut_ref, fin_type, fin_ref, intensite FROM fasting_periods ORDER BY code;")
+            fasting = [{"code": r[0], "debut_type": r[1], "debut_ref": _json_value(r[2]), "fin_type": r[3],
+                        "fin_ref": _json_value(r[4]), "intensite": r[5]} for r in cur.fetchall()]
+            cur.execute("SELECT code, feast_code, feast_day, feast_month, mapping FROM paramon_rules ORDER BY code;")
+            paramon = [{"code": r[0], "feast_code": r[1], "feast_day": r[2], "feast_month": r[3], "mapping": _json_value(r[4])} for r in cur.fetchall()]
+            # Noms seulement : l'index de recherche n'a pas besoin des fiches complètes
+            cur.execute("SELECT id, nom_ar, nom_fr, type, fiabilite FROM saints ORDER BY id;")
+            names = [dict(zip(("id", "nom_ar", "nom_fr", "type", "fiabilite"), r)) for r in cur.fetchall()]
+
+        # Les tables n'ont pas d'ordre : celui des données (ordre des fêtes d'un jour, des résultats de recherche
+        # à égalité) est conservé dans master_meta, comme la priorité des jeûnes (leur rang dans les données)
+        order = _json_value(meta.get("record_order") or "{}")
+        paramon = _in_data_order(paramon, order.get("paramon_rules", []), "code")
+        data = {"version": meta.get("version"),
+                "feasts_fixed": _in_data_order(fixed, order.get("feasts_fixed", []), "code"),
+                "feasts_movable": _in_data_order(movable, order.get("feasts_movable", []), "code"),
+                "fasting_periods": _in_data_order(fasting, _json_value(meta.get("fasting_priority") or "[]"), "code"),
+                "paramon_rules": {r.pop("code"): r for r in paramon}}
+        names = _in_data_order(names, order.get("saints", []), "id")
+
+        index = LazyDayIndex(cc.compile_day_index(data), self.saints_on, self.day_cache_cells)
+        cc.attach_day_index(data, index)
+        self._index = index
+        # Imports antérieurs à l'empreinte du contenu : la version seule
+        sha = meta.get("content_sha256")
+        revision = f"{data['version']}+{sha[:12]}" if sha else str(data["version"])
+        return Dataset(data, search_index.build_indices({**data, "saints": names}), "postgres", data["version"], revision)
+
+    def saints_on(self, month: int, day: int) -> Tuple[Saint, ...]:
+        """Saints commémorés un jour copte, dans l'ordre de daily_commemorations."""
+        with self.cursor() as cur:
+            cur.execute("SELECT liste_saints FROM daily_commemorations WHERE mois_copte = %s AND jour_copte = %s ORDER BY id;", (month, day))
+            ids: List[int] = [i for (ls,) in cur.fetchall() for i in _json_value(ls)]
+            if not ids:
+                return ()
+            cur.execute("SELECT id, nom_ar, nom_fr, type, fiabilite FROM saints WHERE id = ANY(%s);", (ids,))
+            by_id = {r[0]: Saint(id=r[0], nom_ar=r[1] or "", nom_fr=r[2], type=r[3], fiabilite=r[4] if r[4] is not None else "moyenne") for r in cur.fetchall()}
+        return tuple(by_id[i] for i in ids if i in by_id)
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.kind, "pool": {"min": self.pool.minconn, "max": self.pool.maxconn},
+                "day_cache": self._index.info() if self._index is not None else None}
+
+# --- Jeu de données courant et rechargement à chaud ---
+
+class DataSourceManager:
+    """Garde le jeu de données courant et le remplace sans interruption quand la source change.
+
+    Un rechargement (sondage de l'empreinte de la source, signal ou endpoint d'administration)
+    charge, valide et indexe les nouvelles données hors du chemin des requêtes, puis remplace
+    le Dataset courant par une simple affectation. Les requêtes en cours gardent leur référence
+    à l'ancien Dataset ; les fonctions `on_swap(ancien, nouveau)` invalident ensuite les caches
+    liés à l'ancienne révision. En cas d'échec, l'ancien jeu de données reste servi.
+    """
+
+    def __init__(self, source, poll_seconds: float = 0.0, on_swap: Optional[List[Callable[[Dataset, Dataset], None]]] = None):
+        self.source = source
+        self.poll_seconds = poll_seconds
+        self.on_swap = on_swap or []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._fingerprint = source.fingerprint()
+        self._failed_fingerprint = None
+        self._dataset = source.load()
+        self._status: Dict[str, Any] = {"reloads": 0, "failures": 0, "last_trigger": None, "last_reload": None, "last_error": None}
+
+    def current(self) -> Dataset:
+        return self._dataset
+
+    def reload(self, trigger: str = "manual", force: bool = False) -> Dict[str, Any]:
+        """Recharge la source si son empreinte a changé (ou toujours si `force`) ; renvoie le résultat.
+
+        Les rechargements concurrents sont sérialisés : un déclencheur arrivant pendant un
+        rechargement attend sa fin, puis ne trouve plus de changement.
+        """
+        with self._reload_lock:
+            old = self._dataset
+            try:
+                fingerprint = self.source.fingerprint()
+            except Exception as e:
+                return self._failed(trigger, old, e)
+            if not force and fingerprint in (self._fingerprint, self._failed_fingerprint):
+                # Inchangée, ou déjà refusée : on attend la prochaine modification
+                return {"status": "unchanged", "revision": old.revision}
+            try:
+                new = self.source.load()
+                # Préchauffage hors du chemin des requêtes : année liturgique courante
+                cc.liturgical_year(new.data, datetime.date.today().year)
+            except Exception as e:
+                self._failed_fingerprint = fingerprint
+                return self._failed(trigger, old, e)
+
+            self._fingerprint, self._failed_fingerprint = fingerprint, None
+            if new.revision == old.revision:
+                cc.forget_data(new.data)
+                return {"status": "unchanged", "revision": old.revision}
+            self._dataset = new
+            for callback in self.on_swap:
+                callback(old, new)
+            self._status.update(reloads=self._status["reloads"] + 1, last_trigger=trigger,
+                                last_reload=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), last_error=None)
+            logger.info("Données rechargées (%s) : %s -> %s", trigger, old.revision, new.revision)
+            return {"status": "reloaded", "previous": old.revision, "revision": new.revision}
+
+    def _failed(self, trigger: str, old: Dataset, error: Exception) -> Dict[str, Any]:
+        self._status.update(failures=self._status["failures"] + 1, last_trigger=trigger, last_error=str(error))
+        logger.error("Rechargement des données (%s) refusé, données actuelles conservées : %s", trigger, error)
+        return {"status": "failed", "revision": old.revision, "error": str(error)}
+
+    def request_reload(self, trigger: str, force: bool = False) -> None:
+        """Lance un rechargement dans un thread d'arrière-plan (utilisable depuis un gestionnaire de signal)."""
+        threading.Thread(target=self.reload, args=(trigger, force), name="data-reload", daemon=True).start()
+
+    def start_watcher(self) -> None:
+        """Sonde l'empreinte de la source toutes les `poll_seconds` dans un thread d'arrière-plan."""
+        if self.poll_seconds <= 0 or self._watcher is not None:
+            return
+        def watch():
+            while not self._stop.wait(self.poll_seconds):
+                self.reload("poll")
+        self._stop.clear()
+        self._watcher = threading.Thread(target=watch, name="data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def info(self) -> Dict[str, Any]:
+        return {**self._status, "revision": self._dataset.revision, "poll_seconds": self.poll_seconds}
+
+def make_source(kind: str, data_path: str, snapshot_path: str, dsn: Optional[str] = None,
+                min_conn: int = 1, max_conn: int = 8, day_cache_cells: int = 390, schema_path: Optional[str] = None):
+    """Construit le backend `kind` ('json' ou 'postgres')."""
+    if kind == "json":
+        return JsonSource(data_path, snapshot_path, schema_path, day_cache_cells)
+    if kind == "postgres":
+        if not dsn:
+            raise RuntimeError("DATA_SOURCE=postgres nécessite DATABASE_DSN.")
+        return PostgresSource(dsn, min_conn, max_conn, day_cache_cells)
+    raise RuntimeError(f"Source de données inconnue : {kind!r} (attendu : 'json' ou 'postgres').")
@@ -1,55 +1,401 @@
-from fastapi import FastAPI, Query, HTTPException
-import datetime, json, os
+from fastapi import FastAPI, Header, Query, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import asyncio, contextlib, datetime, gc, hmac, logging, os, signal, time, zoneinfo
 from . import calendar_core as cc
+from . import data_source
+from . import metrics
+from . import response_cache
 from . import search_index
+from . import workers
 
 # Chemin vers le fichier de données, configurable via une variable d'environnement
 DATA_PATH = os.environ.get("MASTER_DATA_PATH", "data/master_data.json")
+# Snapshot binaire compilé par scripts/compile_snapshot.py (ignoré s'il est absent ou périmé)
+SNAPSHOT_PATH = os.environ.get("MASTER_SNAPSHOT_PATH", os.path.splitext(DATA_PATH)[0] + ".snap")
+# Source des données : 'json' (fichier/snapshot en mémoire) ou 'postgres' (base remplie par scripts/import_data.py)
+DATA_SOURCE = os.environ.get("DATA_SOURCE", "json")
+DATABASE_DSN = os.environ.get("DATABASE_DSN")
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "8"))
+# Nombre de jours coptes (sur 390) dont les saints sont gardés en mémoire (backend postgres, ou json servi par le snapshot)
+DAY_CACHE_CELLS = int(os.environ.get("DAY_CACHE_CELLS", "390"))
+# Schéma contre lequel un JSON rechargé est validé avant d'être servi
+SCHEMA_PATH = os.environ.get("MASTER_SCHEMA_PATH", "schemas/master_schema.json")
+# Intervalle de sondage de la source pour le rechargement à chaud (date de modification du JSON,
+# version en base) ; 0 : seulement sur signal SIGHUP ou POST /admin/reload
+VERSION_POLL_SECONDS = float(os.environ.get("DATA_VERSION_POLL_SECONDS", "30" if DATA_SOURCE == "postgres" else "5"))
+# Jeton exigé par les endpoints /admin (désactivés s'il n'est pas défini)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+# Taille maximale du cache des réponses pré-encodées, et durée de cache HTTP côté client/CDN
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+CACHE_CONTROL = f"public, max-age={int(os.environ.get('RESPONSE_MAX_AGE', '86400'))}"
+# Nombre maximal de jours servis par /range (la réponse est diffusée en flux, la limite borne le temps CPU)
+RANGE_MAX_DAYS = int(os.environ.get("RANGE_MAX_DAYS", str(400 * 366)))
+# Nombre maximal de dates par requête POST /days
+BATCH_MAX_DATES = int(os.environ.get("BATCH_MAX_DATES", "1000"))
+# Étendue maximale (en années) d'une requête /occurrences
+OCCURRENCES_MAX_YEARS = int(os.environ.get("OCCURRENCES_MAX_YEARS", "500"))
+# Pool des constructions coûteuses (/year, /range, /days) : calculs simultanés, et calculs admis
+# (en cours ou en attente) au-delà desquels les nouvelles requêtes reçoivent un 503
+HEAVY_WORKERS = int(os.environ.get("HEAVY_WORKERS", str(min(4, os.cpu_count() or 1))))
+HEAVY_MAX_PENDING = int(os.environ.get("HEAVY_MAX_PENDING", "32"))
+# Fuseau horaire du « jour courant » : les réponses /day d'aujourd'hui et de demain sont précalculées à minuit
+CALENDAR_TIMEZONE = zoneinfo.ZoneInfo(os.environ.get("CALENDAR_TIMEZONE", "Africa/Cairo"))
+LANGS = ("ar", "fr")
 
-# Chargement des données au démarrage de l'application
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    MASTER_DATA = json.load(f)
+logger = logging.getLogger(__name__)
 
-# Construction de l'index de recherche au démarrage
-SEARCH_INDEX = search_index.build_indices(MASTER_DATA)
+# Chargement des données au démarrage, depuis la source configurée
+SOURCE = data_source.make_source(DATA_SOURCE, DATA_PATH, SNAPSHOT_PATH, DATABASE_DSN, DB_POOL_MIN, DB_POOL_MAX, DAY_CACHE_CELLS, SCHEMA_PATH)
+DATASETS = data_source.DataSourceManager(SOURCE, VERSION_POLL_SECONDS)
+
+# Les données chargées au démarrage ne changent plus : gc.freeze les sort des collectes (moins d'objets
+# parcourus). Si le serveur forke ses workers après l'import (gunicorn --preload), leurs pages restent
+# aussi partagées, le GC ne les réécrivant plus. Les données d'un rechargement à chaud ne sont pas gelées.
+gc.freeze()
+
+# Cache des réponses /day, /week et /year, clé (révision des données, type, langue, plage)
+RESPONSE_CACHE = response_cache.ResponseCache(RESPONSE_CACHE_BYTES)
+POOL = workers.WorkerPool(HEAVY_WORKERS, HEAVY_MAX_PENDING)
+# Réponses /day d'aujourd'hui et de demain par langue, même clé que RESPONSE_CACHE (hors LRU) ; remplacé d'un bloc
+TODAY_BODIES: Dict[tuple, bytes] = {}
+
+def precompute_today(ds: Optional[data_source.Dataset] = None) -> None:
+    """Précalcule les réponses /day d'aujourd'hui et de demain (CALENDAR_TIMEZONE) pour chaque langue."""
+    global TODAY_BODIES
+    ds = ds or DATASETS.current()
+    today = datetime.datetime.now(CALENDAR_TIMEZONE).date()
+    bodies = {}
+    for d in (today, today + datetime.timedelta(days=1)):
+        for lang in LANGS:
+            bodies[(ds.revision, "day", lang, d.isoformat())] = response_cache.encode_json(cc.build_day(ds.data, d, lang))
+    TODAY_BODIES = bodies
+
+async def midnight_refresh() -> None:
+    """Tâche de fond : renouvelle les réponses précalculées à chaque minuit (CALENDAR_TIMEZONE)."""
+    while True:
+        now = datetime.datetime.now(CALENDAR_TIMEZONE)
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), CALENDAR_TIMEZONE)
+        # Différence en temps absolu (timestamp) : correcte aussi les jours de changement d'heure
+        await asyncio.sleep(max(0.0, midnight.timestamp() - now.timestamp()) + 0.5)
+        try:
+            await asyncio.to_thread(precompute_today)
+        except Exception:
+            logger.exception("Échec du précalcul des réponses du jour")
+
+def invalidate_caches(old: data_source.Dataset, new: data_source.Dataset) -> None:
+    """Après un rechargement : n'invalide que les caches liés à l'ancienne révision des données."""
+    RESPONSE_CACHE.invalidate(old.revision)
+    precompute_today(new)
+    cc.forget_data(old.data)
+
+DATASETS.on_swap.append(invalidate_caches)
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    DATASETS.start_watcher()
+    # SIGHUP : rechargement immédiat (indisponible hors du thread principal ou sous Windows)
+    with contextlib.suppress(AttributeError, ValueError):
+        signal.signal(signal.SIGHUP, lambda signum, frame: DATASETS.request_reload("signal", force=True))
+    precompute_today()
+    refresh = asyncio.create_task(midnight_refresh())
+    yield
+    refresh.cancel()
+    DATASETS.stop_watcher()
+    POOL.shutdown()
 
 # Initialisation de l'application FastAPI
-app = FastAPI(title="Coptic Calendar API", version=MASTER_DATA.get("version", "0.0.0"))
+app = FastAPI(title="Coptic Calendar API", version=DATASETS.current().version or "0.0.0", lifespan=lifespan)
+
+if metrics.ENABLED or metrics.PROFILING_ENABLED:
+    # Middleware installé seulement si l'instrumentation est demandée : aucun coût sinon
+    @app.middleware("http")
+    async def instrument(request: Request, call_next):
+        """Durée des requêtes par route, et profil par échantillonnage si l'en-tête X-Profile est présent."""
+        profiler = metrics.try_profile() if metrics.PROFILING_ENABLED and request.headers.get("x-profile") else None
+        t = time.perf_counter()
+        if profiler is None:
+            response = await call_next(request)
+        else:
+            try:
+                with profiler:
+                    response = await call_next(request)
+            finally:
+                out = metrics.save_profile(profiler, request.url.path)
+            response.headers["X-Profile-File"] = str(out)
+        if metrics.ENABLED:
+            route = request.scope.get("route")
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - t, route.path if route is not None else "unmatched", str(response.status_code))
+        return response
 
 @app.get("/health")
 def health():
     """Endpoint pour vérifier que l'API est en ligne."""
-    return {"status": "ok", "version": MASTER_DATA.get("version")}
+    ds = DATASETS.current()
+    return {"status": "ok", "version": ds.version, "source": ds.source, "revision": ds.revision, "data_source": SOURCE.info(), "reload": DATASETS.info(),
+            "caches": {"liturgical_year": cc.year_cache_info(), "responses": RESPONSE_CACHE.info(), "today": len(TODAY_BODIES),
+                       "occurrences": cc.occurrence_table(ds.data).info()}, "workers": POOL.info()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Métriques au format texte Prometheus : temps par étape (si METRICS_ENABLED=1), caches, index."""
+    responses = RESPONSE_CACHE.info()
+    normalize = search_index.normalize_query.cache_info()
+    caches = {
+        "liturgical_year": cc.year_cache_info(),
+        "responses": {**responses, "size": responses["entries"]},
+        "normalize_query": {"hits": normalize.hits, "misses": normalize.misses, "size": normalize.currsize},
+    }
+    day_cache = SOURCE.info().get("day_cache")
+    if day_cache:
+        caches["day_cells"] = day_cache
+    body = metrics.render(DATASETS.current(), caches, DATASETS.info())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+def cached_response(request: Request, ds: data_source.Dataset, key: tuple) -> Tuple[Optional[Response], Dict[str, str], tuple]:
+    """304 si le client a déjà la réponse, ou réponse déjà encodée (précalculée ou en cache) ; sinon None.
+
+    Renvoie aussi les en-têtes (ETag) et la clé du cache pour construire la réponse manquante.
+    """
+    etag = response_cache.make_etag(ds.revision, key)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if response_cache.etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers), headers, ()
+    cache_key = (ds.revision,) + key
+    body = TODAY_BODIES.get(cache_key)
+    if body is None:
+        body = RESPONSE_CACHE.get(cache_key)
+    if body is None:
+        return None, headers, cache_key
+    return Response(content=body, media_type="application/json", headers=headers), headers, cache_key
+
+def build_cached(cache_key: tuple, build: Callable[[], Any]) -> bytes:
+    body = response_cache.encode_json(build())
+    # Construite sur des données remplacées entre-temps : servie, mais pas remise dans le cache déjà invalidé
+    if cache_key[0] == DATASETS.current().revision:
+        RESPONSE_CACHE.put(cache_key, body)
+    return body
+
+def cached_json(request: Request, ds: data_source.Dataset, key: tuple, build) -> Response:
+    """Sert une réponse JSON depuis le cache pré-encodé, avec ETag et 304 si le client l'a déjà."""
+    response, headers, cache_key = cached_response(request, ds, key)
+    if response is not None:
+        return response
+    return Response(content=build_cached(cache_key, build), media_type="application/json", headers=headers)
+
+async def run_heavy(key: tuple, fn: Callable[[], Any], queue_when_full: bool = False) -> Any:
+    """Exécute une construction coûteuse dans le pool borné ; 503 si la file est pleine."""
+    try:
+        return await POOL.run(key, fn, queue_when_full)
+    except workers.PoolBusy:
+        raise HTTPException(status_code=503, detail="Serveur occupé, réessayez plus tard.", headers={"Retry-After": "1"})
+
+async def pooled_json(request: Request, ds: data_source.Dataset, key: tuple, build) -> Response:
+    """Comme cached_json, mais la réponse manquante est construite dans le pool (un seul calcul par clé à la fois)."""
+    response, headers, cache_key = cached_response(request, ds, key)
+    if response is not None:
+        return response
+    body = await run_heavy(cache_key, lambda: build_cached(cache_key, build))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def check_years(first: int, last: int) -> None:
+    """400 si les années [first, last] sortent de celles prises en charge (cc.MIN_YEAR..cc.MAX_YEAR)."""
+    if first < cc.MIN_YEAR or last > cc.MAX_YEAR:
+        raise HTTPException(status_code=400, detail=f"Année hors limites : seules les années {cc.MIN_YEAR} à {cc.MAX_YEAR} sont prises en charge.")
+
+def check_lang(lang: str) -> None:
+    """400 si la langue n'est pas prise en charge ; vérifiée avant le cache, dont elle fait partie de la clé."""
+    if lang not in LANGS:
+        raise HTTPException(status_code=400, detail="Langue non supportée. Utilisez 'ar' ou 'fr'.")
+
+@app.post("/admin/reload")
+def admin_reload(force: bool = False, x_admin_token: str = Header(default="")):
+    """Recharge les données maîtres sans interruption (attend la fin du rechargement)."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Endpoints d'administration désactivés (ADMIN_TOKEN non défini).")
+    if not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Jeton d'administration invalide.")
+    result = DATASETS.reload("admin", force=force)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=422, detail=result)
+    return result
 
 @app.get("/day")
-def get_day_info(date: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"), lang: str = "ar"):
+async def get_day_info(request: Request, date: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"), lang: str = "ar"):
     """Retourne les informations liturgiques pour une date spécifique."""
     try:
         d = datetime.date.fromisoformat(date)
     except ValueError:
         raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD.")
-    return cc.build_day(MASTER_DATA, d, lang)
+    check_years(d.year, d.year)
+    check_lang(lang)
+    ds = DATASETS.current()
+    # Aujourd'hui, demain et les jours en cache sont servis depuis la boucle, sans passer par un thread
+    response, headers, cache_key = cached_response(request, ds, ("day", lang, d.isoformat()))
+    if response is not None:
+        return response
+    # Sinon construction dans le threadpool : le backend postgres peut lire les saints en base
+    body = await run_in_threadpool(build_cached, cache_key, lambda: cc.build_day(ds.data, d, lang))
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/week")
-def get_week_info(start: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"), lang: str = "ar"):
+def get_week_info(request: Request, start: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"), lang: str = "ar"):
     """Retourne les informations pour une semaine à partir d'une date de début."""
     try:
         d = datetime.date.fromisoformat(start)
     except ValueError:
         raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD.")
-    return cc.build_week(MASTER_DATA, d, lang)
+    # Année de début vérifiée d'abord : d + 6 jours ne peut alors plus déborder de datetime
+    check_years(d.year, d.year)
+    check_years(d.year, (d + datetime.timedelta(days=6)).year)
+    check_lang(lang)
+    ds = DATASETS.current()
+    return cached_json(request, ds, ("week", lang, d.isoformat()), lambda: cc.build_week(ds.data, d, lang))
 
 @app.get("/year")
-def get_year_info(year: int, lang: str = "ar"):
+async def get_year_info(request: Request, year: int, lang: str = "ar"):
     """Retourne les informations pour une année complète."""
-    cache = cc.build_year_cache(MASTER_DATA, year, lang)
-    return {"year": year, "lang": lang, "days": cache}
+    check_years(year, year)
+    check_lang(lang)
+    ds = DATASETS.current()
+    return await pooled_json(request, ds, ("year", lang, year), lambda: {"year": year, "lang": lang, "days": cc.build_year_cache(ds.data, year, lang)})
+
+@app.get("/range")
+async def get_range(start: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"), end: str = Query(..., pattern="^\\d{4}-\\d{2}-\\d{2}$"),
+              lang: str = "ar", fields: str = ""):
+    """Diffuse les jours de `start` à `end` inclus en NDJSON (un objet JSON par ligne).
+
+    `fields` restreint chaque jour aux champs listés (ex. `jeune,date_copte`) ; la date grégorienne est toujours incluse.
+    """
+    try:
+        s, e = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD.")
+    check_lang(lang)
+    if e < s:
+        raise HTTPException(status_code=400, detail="La date de fin doit être postérieure ou égale à la date de début.")
+    # Vérifié avant le début de la diffusion : une erreur ultérieure ne peut plus changer le statut 200
+    check_years(s.year, e.year)
+    if (e - s).days + 1 > RANGE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Plage trop longue (maximum {RANGE_MAX_DAYS} jours).")
+    try:
+        projection = cc.parse_fields(fields)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+
+    ds = DATASETS.current()
+    # Admission vérifiée avant l'envoi des en-têtes ; les années suivantes attendent leur tour dans le pool
+    if POOL.busy():
+        raise HTTPException(status_code=503, detail="Serveur occupé, réessayez plus tard.", headers={"Retry-After": "1"})
+
+    def encode_year(lo: datetime.date, hi: datetime.date) -> bytes:
+        return b"".join(response_cache.encode_json(day) + b"\n" for day in cc.iter_days(ds.data, lo, hi, lang, projection))
+
+    async def lines():
+        # Une année civile par calcul : la mémoire reste bornée et des plages identiques partagent leurs années
+        for year in range(s.year, e.year + 1):
+            lo, hi = max(s, datetime.date(year, 1, 1)), min(e, datetime.date(year, 12, 31))
+            yield await POOL.run((ds.revision, "range", lang, projection, lo, hi), lambda: encode_year(lo, hi), queue_when_full=True)
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": CACHE_CONTROL})
+
+class DaysRequest(BaseModel):
+    dates: List[str]
+    lang: str = "ar"
+    # Liste ou chaîne séparée par des virgules, comme le paramètre fields de /range
+    fields: Union[List[str], str, None] = None
+
+@app.post("/days")
+async def post_days(body: DaysRequest):
+    """Retourne les informations de plusieurs dates quelconques (éventuellement sur plusieurs années), dans l'ordre demandé."""
+    check_lang(body.lang)
+    if len(body.dates) > BATCH_MAX_DATES:
+        raise HTTPException(status_code=400, detail=f"Trop de dates (maximum {BATCH_MAX_DATES}).")
+    dates = []
+    for i, value in enumerate(body.dates):
+        try:
+            dates.append(datetime.date.fromisoformat(value))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Format de date invalide à l'index {i} : {value!r}. Utilisez YYYY-MM-DD.")
+        if not cc.MIN_YEAR <= dates[-1].year <= cc.MAX_YEAR:
+            raise HTTPException(status_code=400, detail=f"Année hors limites à l'index {i} : {value!r} (années {cc.MIN_YEAR} à {cc.MAX_YEAR}).")
+    try:
+        projection = cc.parse_fields(",".join(body.fields) if isinstance(body.fields, list) else body.fields)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    ds = DATASETS.current()
+    content = await run_heavy((ds.revision, "days", body.lang, projection, tuple(dates)),
+                              lambda: response_cache.encode_json({"lang": body.lang, "days": cc.build_days(ds.data, dates, body.lang, projection)}))
+    return Response(content=content, media_type="application/json")
+
+def occurrence_query(table: cc.OccurrenceTable, code: Optional[str], intensite: Optional[str]) -> Tuple[str, str]:
+    """Valide le couple code / intensité de /next et /occurrences ; renvoie (nature, clé) pour la table."""
+    if (code is None) == (intensite is None):
+        raise HTTPException(status_code=400, detail="Indiquez soit 'code' (fête ou période de jeûne), soit 'intensite' (période de jeûne).")
+    if intensite is not None:
+        if intensite not in table.intensities:
+            raise HTTPException(status_code=404, detail=f"Intensité inconnue : {intensite}.")
+        return "intensity", intensite
+    kind = table.kind(code)
+    if kind is None:
+        raise HTTPException(status_code=404, detail=f"Code inconnu : {code}.")
+    return kind, code
+
+def occurrence_to_dict(item) -> Any:
+    return item.isoformat() if isinstance(item, datetime.date) else item.to_dict()
+
+@app.get("/next")
+def get_next(request: Request, code: Optional[str] = None, intensite: Optional[str] = None, after: Optional[str] = None):
+    """Prochaine occurrence d'une fête ou d'une période de jeûne strictement après `after` (par défaut aujourd'hui, CALENDAR_TIMEZONE).
+
+    Les périodes de jeûne sont désignées par leur code ou par leur intensité (ex. `intensite=strict`).
+    """
+    try:
+        a = datetime.date.fromisoformat(after) if after else datetime.datetime.now(CALENDAR_TIMEZONE).date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD.")
+    ds = DATASETS.current()
+    table = cc.occurrence_table(ds.data)
+    kind, key = occurrence_query(table, code, intensite)
+
+    def build():
+        item = table.next_after(kind, key, a)
+        if item is None:
+            raise HTTPException(status_code=404, detail=f"Aucune occurrence dans les {cc.OCCURRENCE_CHUNK_YEARS} ans suivant {a.isoformat()}.")
+        return {"code": code, "intensite": intensite, "after": a.isoformat(), "date" if kind == "feast" else "periode": occurrence_to_dict(item)}
+    return cached_json(request, ds, ("next", kind, key, a.isoformat()), build)
+
+@app.get("/occurrences")
+def get_occurrences(request: Request, code: Optional[str] = None, intensite: Optional[str] = None,
+                    start: str = Query(..., alias="from"), end: str = Query(..., alias="to")):
+    """Toutes les occurrences d'une fête (dates) ou d'une période de jeûne (débutant) de `from` à `to` inclus."""
+    try:
+        s, e = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD.")
+    if e < s:
+        raise HTTPException(status_code=400, detail="La date de fin doit être postérieure ou égale à la date de début.")
+    if e.year - s.year >= OCCURRENCES_MAX_YEARS:
+        raise HTTPException(status_code=400, detail=f"Plage trop longue (maximum {OCCURRENCES_MAX_YEARS} ans).")
+    ds = DATASETS.current()
+    table = cc.occurrence_table(ds.data)
+    kind, key = occurrence_query(table, code, intensite)
+    field = "dates" if kind == "feast" else "periodes"
+    return cached_json(request, ds, ("occurrences", kind, key, s.isoformat(), e.isoformat()),
+                       lambda: {"code": code, "intensite": intensite, "from": s.isoformat(), "to": e.isoformat(),
+                                field: [occurrence_to_dict(i) for i in table.between(kind, key, s, e)]})
 
 @app.get("/search")
 def search_data(q: str, lang: str = "ar", type: str = "all", limit: int = 20, offset: int = 0):
     """Endpoint de recherche dans les données (saints et fêtes)."""
-    if lang not in ("ar", "fr"):
-        raise HTTPException(status_code=400, detail="Langue non supportée. Utilisez 'ar' ou 'fr'.")
+    check_lang(lang)
     if type not in ("all", "saint", "feast"):
         raise HTTPException(status_code=400, detail="Type de recherche non supporté. Utilisez 'all', 'saint', ou 'feast'.")
-    return search_index.search(q, lang, SEARCH_INDEX, type_filter=type, limit=limit, offset=offset)
\ No newline at end of file
+    if not metrics.ENABLED:
+        return search_index.search(q, lang, DATASETS.current().search_index, type_filter=type, limit=limit, offset=offset)
+    t = time.perf_counter()
+    result = search_index.search(q, lang, DATASETS.current().search_index, type_filter=type, limit=limit, offset=offset)
+    metrics.SEARCH_SECONDS.observe(time.perf_counter() - t, lang, type)
+    return result
\ No newline at end of file
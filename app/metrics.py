@@ -0,0 +1,194 @@
+# app/metrics.py
+import bisect, collections, datetime, os, pathlib, sys, threading, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from . import calendar_core as cc
+
+# Instrumentation désactivée par défaut : rien n'est alors mesuré sur le chemin des requêtes
+ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+# Profilage par échantillonnage d'une requête portant l'en-tête X-Profile (désactivé par défaut)
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/coptic-calendar-profiles")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", "1")) / 1000
+
+PREFIX = "coptic_calendar_"
+# Bornes des histogrammes de durée (secondes) : de 5 µs à 5 s
+DURATION_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# --- Histogrammes ---
+
+class Histogram:
+    """Histogramme Prometheus (cumulatif à l'export), une série par jeu de valeurs d'étiquettes."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [compteurs par intervalle..., +Inf, somme]
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in items:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if labels else ""
+            total = 0
+            for bound, n in zip(self.buckets, series):
+                total += n
+                yield f'{self.name}_bucket{{{labels}{sep}le="{bound:g}"}} {total}'
+            total += series[len(self.buckets)]
+            yield f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {total}'
+            yield f"{self.name}_sum{{{labels}}} {series[-1]:.9g}"
+            yield f"{self.name}_count{{{labels}}} {total}"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+BUILD_DAY_STAGES = Histogram("build_day_stage_seconds", "Durée des étapes de construction d'un jour.", ("stage",))
+SEARCH_SECONDS = Histogram("search_seconds", "Durée des recherches (normalisation, correspondances, classement).", ("lang", "type"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Durée des requêtes HTTP.", ("path", "status"))
+
+def _stage(stage: str, start: float) -> float:
+    """Crochet installé dans calendar_core : enregistre la durée d'une étape et renvoie l'instant courant."""
+    now = time.perf_counter()
+    BUILD_DAY_STAGES.observe(now - start, stage)
+    return now
+
+def enable() -> None:
+    """Active l'instrumentation (étapes de build_day, recherches, requêtes)."""
+    global ENABLED
+    ENABLED = True
+    cc.STAGE_HOOK = _stage
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+    cc.STAGE_HOOK = None
+
+if ENABLED:
+    enable()
+
+# --- Export au format texte Prometheus ---
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def gauge(name: str, help: str, samples: Iterable[Tuple[Dict[str, Any], float]], kind: str = "gauge") -> Iterable[str]:
+    """Lignes d'une métrique simple (gauge ou counter) : `samples` est une suite de (étiquettes, valeur)."""
+    yield f"# HELP {PREFIX}{name} {help}"
+    yield f"# TYPE {PREFIX}{name} {kind}"
+    for labels, value in samples:
+        text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        yield f"{PREFIX}{name}{{{text}}} {value:.9g}" if text else f"{PREFIX}{name} {value:.9g}"
+
+def index_sizes(idx: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Tailles de l'index de recherche : documents, n-grammes et entrées de postings par langue."""
+    out = {}
+    for lang, p in idx.get("postings", {}).items():
+        out[lang] = {"documents": len(p["texts"]), "ngrams": len(p["grams"]),
+                     "postings": sum(len(ids) for ids in p["grams"].values()), "memo": len(p["memo"])}
+    return out
+
+def render(dataset, caches: Dict[str, Dict[str, int]], reload_info: Dict[str, Any]) -> str:
+    """Page /metrics : histogrammes (si activés), caches, tailles d'index et état des données."""
+    lines: List[str] = []
+    lines += gauge("enabled", "Instrumentation des temps activée (1) ou non (0).", [({}, int(ENABLED))])
+    lines += gauge("data_info", "Données servies (valeur toujours 1).",
+                   [({"version": dataset.version, "revision": dataset.revision, "source": dataset.source}, 1)])
+    lines += gauge("data_reloads_total", "Rechargements des données réussis.", [({}, reload_info.get("reloads", 0))], "counter")
+    lines += gauge("data_reload_failures_total", "Rechargements des données refusés.", [({}, reload_info.get("failures", 0))], "counter")
+
+    # Caches : compteurs de succès/échecs, taille et ratio de succès
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge"), ("bytes", "gauge")):
+        samples = [({"cache": name}, info[field]) for name, info in caches.items() if field in info]
+        if samples:
+            lines += gauge(f"cache_{field}" + ("_total" if kind == "counter" else ""), f"Caches : {field}.", samples, kind)
+    ratios = [({"cache": name}, info["hits"] / (info["hits"] + info["misses"])) for name, info in caches.items()
+              if info.get("hits", 0) + info.get("misses", 0) > 0]
+    lines += gauge("cache_hit_ratio", "Caches : part des accès servis depuis le cache.", ratios)
+
+    sizes = index_sizes(dataset.search_index)
+    for field in ("documents", "ngrams", "postings", "memo"):
+        lines += gauge(f"search_index_{field}", f"Index de recherche : {field}.", [({"lang": lang}, s[field]) for lang, s in sizes.items()])
+
+    for h in (BUILD_DAY_STAGES, SEARCH_SECONDS, REQUEST_SECONDS):
+        lines += h.render()
+    return "\n".join(lines) + "\n"
+
+# --- Profilage par échantillonnage ---
+
+_APP_DIR = str(pathlib.Path(__file__).resolve().parent)
+_PROFILE_LOCK = threading.Lock()
+
+class SamplingProfiler:
+    """Échantillonne les piles des threads exécutant du code de l'application, à intervalle fixe.
+
+    Le résultat est au format « folded » (une pile par ligne, `f1;f2;f3 n`), lisible par
+    flamegraph.pl, speedscope ou inferno. Les piles de tous les threads exécutant du code de `app/`
+    sont prises : à utiliser sur une instance peu chargée pour isoler une requête.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks: "collections.Counter[str]" = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack, in_app = [], False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(_APP_DIR)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if in_app:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+def profile_path(path: str) -> pathlib.Path:
+    """Fichier de sortie d'un profil : PROFILE_DIR/<horodatage>-<chemin>.folded."""
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    name = path.strip("/").replace("/", "_") or "root"
+    return pathlib.Path(PROFILE_DIR) / f"{stamp}-{name}.folded"
+
+def try_profile() -> Optional[SamplingProfiler]:
+    """Renvoie un profileur si aucun autre profil n'est en cours (un seul à la fois), sinon None."""
+    return SamplingProfiler() if _PROFILE_LOCK.acquire(blocking=False) else None
+
+def save_profile(profiler: SamplingProfiler, path: str) -> pathlib.Path:
+    try:
+        out = profile_path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(profiler.folded(), encoding="utf-8")
+        return out
+    finally:
+        _PROFILE_LOCK.release()
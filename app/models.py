@@ -0,0 +1,119 @@
+# app/models.py
+import dataclasses, datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Champs d'un jour dans les réponses de l'API, dans l'ordre de sérialisation
+DAY_FIELDS = ("date_gregorienne", "date_copte", "periode_liturgique", "jeune", "fetes", "commemorations")
+COPTIC_MONTHS_AR = ["توت","بابه","هاتور","كيهك","طوبه","أمشير","برمهات","برموده","بشنس","بؤونه","أبيب","مسرى","النسئ"]
+
+def _pick(ar: str, fr: Optional[str], lang: str) -> str:
+    """Texte dans la langue demandée, avec repli sur l'arabe (comme `obj.get(f"x_{lang}", obj.get("x_ar", ""))`)."""
+    return fr if lang == "fr" and fr is not None else ar
+
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
+class CopticDate:
+    """Date copte ; l'ordre des champs donne l'ordre chronologique."""
+    annee_copte: int
+    mois_num: int
+    jour: int
+
+    @property
+    def mois(self) -> str:
+        return COPTIC_MONTHS_AR[self.mois_num - 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"jour": self.jour, "mois": self.mois, "mois_num": self.mois_num, "annee_copte": self.annee_copte}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Feast:
+    """Fête fixe ou mobile ; `gregorian_date` n'est renseignée que pour une occurrence datée."""
+    code: str
+    rang: Optional[str] = None
+    titre_ar: str = ""
+    titre_fr: Optional[str] = None
+    resume_ar: str = ""
+    resume_fr: Optional[str] = None
+    gregorian_date: Optional[datetime.date] = None
+
+    @classmethod
+    def from_dict(cls, f: Dict[str, Any], gregorian_date: Optional[datetime.date] = None) -> "Feast":
+        return cls(code=f["code"], rang=f.get("rang"), titre_ar=f.get("titre_ar", ""), titre_fr=f.get("titre_fr"),
+                   resume_ar=f.get("resume_ar", ""), resume_fr=f.get("resume_fr"), gregorian_date=gregorian_date)
+
+    def to_dict(self, lang: str) -> Dict[str, Any]:
+        return {"code": self.code, "titre": _pick(self.titre_ar, self.titre_fr, lang),
+                "resume": _pick(self.resume_ar, self.resume_fr, lang), "rang": self.rang}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Saint:
+    id: int
+    nom_ar: str = ""
+    nom_fr: Optional[str] = None
+    type: Optional[str] = None
+    resume_ar: str = ""
+    resume_fr: Optional[str] = None
+    fiabilite: Optional[str] = "moyenne"
+
+    @classmethod
+    def from_dict(cls, s: Dict[str, Any]) -> "Saint":
+        return cls(id=s["id"], nom_ar=s.get("nom_ar", ""), nom_fr=s.get("nom_fr"), type=s.get("type"),
+                   resume_ar=s.get("resume_ar", ""), resume_fr=s.get("resume_fr"), fiabilite=s.get("fiabilite", "moyenne"))
+
+    def to_dict(self, lang: str) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "nom": _pick(self.nom_ar, self.nom_fr, lang),
+                "resume": _pick(self.resume_ar, self.resume_fr, lang), "fiabilite": self.fiabilite}
+
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
+class FastingPeriod:
+    """Période de jeûne résolue pour une année ; triée par date de début, la priorité est l'ordre des données."""
+    debut: datetime.date
+    fin: datetime.date
+    priorite: int
+    code: str
+    intensite: str = "normal"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "debut": self.debut.isoformat(), "fin": self.fin.isoformat(), "intensite": self.intensite}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FastingStatus:
+    est_jeune: bool
+    type: Optional[str]
+    intensite: str
+    source_rule: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"est_jeune": self.est_jeune, "type": self.type, "intensite": self.intensite, "source_rule": self.source_rule}
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DayRecord:
+    """Données liturgiques d'un jour, indépendantes de la langue (sérialisées par `to_dict`)."""
+    date: datetime.date
+    date_copte: CopticDate
+    periode_liturgique: str
+    jeune: FastingStatus
+    fetes: Tuple[Feast, ...]
+    commemorations: Tuple[Saint, ...]
+
+    def to_dict(self, lang: str = "ar", fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """Forme JSON de l'API ; `fields` restreint aux champs demandés (la date grégorienne est toujours incluse)."""
+        if fields is None:
+            return {
+                "date_gregorienne": self.date.isoformat(), "date_copte": self.date_copte.to_dict(),
+                "periode_liturgique": self.periode_liturgique, "jeune": self.jeune.to_dict(),
+                "fetes": [f.to_dict(lang) for f in self.fetes],
+                "commemorations": [s.to_dict(lang) for s in self.commemorations],
+            }
+        out: Dict[str, Any] = {"date_gregorienne": self.date.isoformat()}
+        for name in fields:
+            if name == "date_copte":
+                out[name] = self.date_copte.to_dict()
+            elif name == "periode_liturgique":
+                out[name] = self.periode_liturgique
+            elif name == "jeune":
+                out[name] = self.jeune.to_dict()
+            elif name == "fetes":
+                out[name] = [f.to_dict(lang) for f in self.fetes]
+            elif name == "commemorations":
+                out[name] = [s.to_dict(lang) for s in self.commemorations]
+        return out
@@ -0,0 +1,76 @@
+# app/response_cache.py
+import collections, hashlib, json, threading
+from typing import Any, Dict, Optional, Tuple
+
+# À incrémenter quand le format des réponses change sans changement de version des données
+FORMAT_REVISION = "1"
+
+def encode_json(obj: Any) -> bytes:
+    """Encode une réponse comme le JSONResponse de FastAPI (UTF-8 compact)."""
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def make_etag(version: str, key: Tuple) -> str:
+    """ETag fort dérivé de la version des données et de la clé de la requête."""
+    digest = hashlib.sha1(repr((FORMAT_REVISION, version) + tuple(key)).encode("utf-8")).hexdigest()
+    return f'"{version}-{digest[:20]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vérifie un en-tête If-None-Match (comparaison faible, listes et '*' acceptés)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+class ResponseCache:
+    """Cache LRU de réponses JSON pré-encodées, borné par le nombre total d'octets."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "collections.OrderedDict[Tuple, bytes]" = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return body
+
+    def put(self, key: Tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, revision: str) -> int:
+        """Supprime les entrées d'une révision des données (premier élément de la clé) ; renvoie leur nombre."""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == revision]
+            for k in keys:
+                self._size -= len(self._entries.pop(k))
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
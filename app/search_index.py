@@ -1,24 +1,83 @@
 # app/search_index.py
-import re, unicodedata
+import array, bisect, collections, functools, heapq, itertools, re, threading, unicodedata
+
+# Postings de tous les n-grammes de 1 à NGRAM caractères : une requête de NGRAM caractères au plus
+# est une simple lecture, les plus longues partent du trigramme le plus rare puis vérifient la sous-chaîne.
+NGRAM = 3
+# Requêtes normalisées gardées (LRU) par index et par langue, et requêtes brutes dans normalize_query
+QUERY_MEMO_SIZE = 4096
+# Les mémos (un OrderedDict par index et langue) sont partagés entre les threads des requêtes
+_MEMO_LOCK = threading.Lock()
+# Au-delà de ce nombre de noms partageant le préfixe, la page est prise dans les correspondances
+PREFIX_SORT_MAX = 256
+
+# Table arabe : suppression des diacritiques (0610-061A, 064B-065E) et du tatweel,
+# pliage des alefs (أإآ -> ا), de la ta marbuta (ة -> ه) et de l'alef maqsura (ى -> ي)
+_AR_TABLE = str.maketrans(
+    {"أ":"ا", "إ":"ا", "آ":"ا", "ة":"ه", "ى":"ي", "ـ":None,
+     **{c:None for c in [*range(0x0610,0x061B), *range(0x064B,0x065F)]}}
+)
+
+# Plages pour lesquelles la table française reproduit exactement NFD + suppression des Mn :
+# latin (y compris étendu et diacritiques combinants) et arabe.
+_FR_RANGES = [(0x0080,0x0370), (0x0600,0x0700), (0x1E00,0x1F00)]
+_FR_OTHER = re.compile(r"[^\x00-\x7f" + "".join(rf"\u{lo:04x}-\u{hi-1:04x}" for lo, hi in _FR_RANGES) + "]")
+
+def _strip_marks(s:str)->str:
+    return "".join(ch for ch in unicodedata.normalize("NFD", s) if unicodedata.category(ch)!="Mn")
+
+_FR_TABLE = str.maketrans({
+    c: (_strip_marks(chr(c)) or None)
+    for lo, hi in _FR_RANGES for c in range(lo, hi) if _strip_marks(chr(c)) != chr(c)
+})
 
 def normalize_ar(s:str)->str:
     """Nettoie une chaîne de caractères en arabe pour la recherche."""
     if not s: return ""
-    # Supprimer les diacritiques arabes
-    diac = "".join(chr(c) for c in range(0x0610,0x061B)) + "".join(chr(c) for c in range(0x064B,0x065F))
-    table = str.maketrans("", "", diac)
-    s = s.translate(table)
-    # Normaliser les caractères (أإآ -> ا, ة -> ه, ى -> ي)
-    s = s.replace("أ","ا").replace("إ","ا").replace("آ","ا").replace("ة","ه").replace("ى","ي")
-    return s
+    return s.translate(_AR_TABLE)
 
 def normalize_fr(s:str)->str:
     """Nettoie une chaîne de caractères en français pour la recherche."""
     if not s: return ""
-    # Enlever les accents
-    s = unicodedata.normalize("NFD", s)
-    s = "".join(ch for ch in s if unicodedata.category(ch)!="Mn")
-    return s.lower()
+    # Enlever les accents : table pré-calculée, décomposition complète pour les autres écritures
+    if s.isascii():
+        return s.lower()
+    if _FR_OTHER.search(s):
+        return _strip_marks(s).lower()
+    return s.translate(_FR_TABLE).lower()
+
+@functools.lru_cache(maxsize=QUERY_MEMO_SIZE)
+def normalize_query(q:str, lang:str)->str:
+    """Normalise une requête de recherche (mémorisé : les requêtes se répètent beaucoup)."""
+    return normalize_ar(q) if lang=="ar" else normalize_fr(q)
+
+def _build_postings(docs:list, lang:str):
+    """Construit les postings des n-grammes de 1 à NGRAM caractères (ids de documents triés) et l'ordre des noms pour une langue."""
+    texts = [doc[f"search_{lang}"] for doc in docs]
+    grams = collections.defaultdict(list)
+    for doc_id, text in enumerate(texts):
+        doc_grams = {text[i:i+NGRAM] for i in range(len(text)-NGRAM+1)}
+        # Bigrammes : débuts des trigrammes, plus le dernier ; unigrammes : les caractères du texte
+        doc_grams.update({g[:2] for g in doc_grams}, (text[-2:],), text)
+        doc_grams.discard("")
+        for g in doc_grams:
+            grams[g].append(doc_id)
+    names = [doc[f"name_{lang}"] for doc in docs]
+    name_order = sorted(range(len(docs)), key=names.__getitem__)
+    return _postings(docs, lang, {g: array.array("I", ids) for g, ids in grams.items()}, array.array("I", name_order))
+
+def _postings(docs:list, lang:str, grams:dict, name_ids):
+    """Postings d'une langue à partir des n-grammes et de l'ordre des noms, construits ou lus d'un snapshot."""
+    texts = [doc[f"search_{lang}"] for doc in docs]
+    names = [doc[f"name_{lang}"] for doc in docs]
+    return {
+        "texts": texts,
+        "grams": grams,
+        "memo": collections.OrderedDict(),
+        "names": names,
+        "name_keys": [names[i] for i in name_ids],
+        "name_ids": name_ids,
+    }
 
 def build_indices(data:dict):
     """Construit un index de recherche en mémoire à partir des données principales."""
@@ -31,6 +90,8 @@ def build_indices(data:dict):
             "nom_fr":s.get("nom_fr"),
             "search_ar":normalize_ar(" ".join(filter(None,[s.get("nom_ar"), s.get("resume_ar","")[:80]]))),
             "search_fr":normalize_fr(" ".join(filter(None,[s.get("nom_fr"), s.get("resume_fr","") or s.get("resume_ar","")[:80]]))),
+            "name_ar":normalize_ar(s.get("nom_ar") or ""),
+            "name_fr":normalize_fr(s.get("nom_fr") or ""),
             "fiabilite":s.get("fiabilite")
         })
     
@@ -43,36 +104,108 @@ def build_indices(data:dict):
             "titre_ar":f.get("titre_ar"),
             "titre_fr":f.get("titre_fr"),
             "search_ar":normalize_ar(" ".join(filter(None,[f.get("code"),f.get("titre_ar"),f.get("resume_ar","")[:80]]))),
-            "search_fr":normalize_fr(" ".join(filter(None,[f.get("code"),f.get("titre_fr") or f.get("titre_ar"),f.get("resume_ar","")[:80]])))
+            "search_fr":normalize_fr(" ".join(filter(None,[f.get("code"),f.get("titre_fr") or f.get("titre_ar"),f.get("resume_ar","")[:80]]))),
+            "name_ar":normalize_ar(f.get("titre_ar") or ""),
+            "name_fr":normalize_fr(f.get("titre_fr") or f.get("titre_ar") or "")
         })
-        
-    return {"saints":saints_index,"feasts":feasts_index}
+
+    # Les saints occupent les ids [0, n_saints), les fêtes la suite : le filtre de type est une plage d'ids
+    docs = saints_index + feasts_index
+    return _index(docs, len(saints_index), {lang:_build_postings(docs, lang) for lang in ("ar","fr")})
+
+def restore_indices(docs:list, n_saints:int, grams:dict, name_ids:dict):
+    """Reconstruit l'index à partir de ses tableaux (snapshot) : documents, puis par langue
+    les ids de chaque n-gramme et les ids triés par nom (séquences d'entiers triées, ex. memoryview)."""
+    return _index(docs, n_saints, {lang:_postings(docs, lang, grams[lang], name_ids[lang]) for lang in grams})
+
+def _index(docs:list, n_saints:int, postings:dict):
+    return {
+        "saints":docs[:n_saints],
+        "feasts":docs[n_saints:],
+        "docs":docs,
+        "n_saints":n_saints,
+        "postings":postings,
+    }
+
+def _matches(nq:str, postings:dict):
+    """Ids triés des documents dont le texte de recherche contient nq (mémorisés par requête, LRU)."""
+    memo = postings["memo"]
+    with _MEMO_LOCK:
+        ids = memo.get(nq)
+        if ids is not None:
+            memo.move_to_end(nq)
+            return ids
+    texts = postings["texts"]
+    if len(nq) <= NGRAM:
+        # Requêtes courtes (début d'autocomplétion compris) : la posting est exactement la réponse
+        return postings["grams"].get(nq, ())
+    # Le trigramme le plus rare borne les candidats, la vérification de la sous-chaîne fait le reste
+    rarest = min((postings["grams"].get(nq[i:i+NGRAM], ()) for i in range(len(nq)-NGRAM+1)), key=len)
+    ids = array.array("I", [i for i in rarest if nq in texts[i]])
+    with _MEMO_LOCK:
+        memo[nq] = ids
+        while len(memo) > QUERY_MEMO_SIZE:
+            memo.popitem(last=False)
+    return ids
+
+def _type_slice(ids, lo:int, hi:int):
+    """Restreint une liste triée d'ids à la plage [lo, hi)."""
+    return ids[bisect.bisect_left(ids, lo):bisect.bisect_left(ids, hi)]
+
+def _result(doc:dict):
+    if doc["type"] == "saint":
+        return {
+            "resource_type":"saint",
+            "id":doc["id"],
+            "nom_ar":doc["nom_ar"],
+            "nom_fr":doc["nom_fr"],
+            "fiabilite":doc["fiabilite"]
+        }
+    return {
+        "resource_type":"feast",
+        "code":doc["code"],
+        "titre_ar":doc["titre_ar"],
+        "titre_fr":doc["titre_fr"]
+    }
 
 def search(q:str, lang:str, data_idx:dict, type_filter:str="all", limit:int=20, offset:int=0):
-    """Effectue une recherche dans l'index."""
-    nq = (normalize_ar(q) if lang=="ar" else normalize_fr(q))
-    res=[]
-    
-    if type_filter in ("all","saint"):
-        for s in data_idx["saints"]:
-            if nq in s[f"search_{lang}"]:
-                res.append({
-                    "resource_type":"saint",
-                    "id":s["id"],
-                    "nom_ar":s["nom_ar"],
-                    "nom_fr":s["nom_fr"],
-                    "fiabilite":s["fiabilite"]
-                })
-
-    if type_filter in ("all","feast"):
-        for f in data_idx["feasts"]:
-            if nq in f[f"search_{lang}"]:
-                res.append({
-                    "resource_type":"feast",
-                    "code":f["code"],
-                    "titre_ar":f["titre_ar"],
-                    "titre_fr":f["titre_fr"]
-                })
-                
-    total=len(res)
-    return {"total":total,"results":res[offset:offset+limit]}
\ No newline at end of file
+    """Effectue une recherche dans l'index.
+
+    Les résultats sont classés : nom exact, puis nom commençant par la requête, puis simple
+    sous-chaîne ; à égalité, ordre des données. Seule la page demandée est construite.
+    """
+    nq = normalize_query(q, lang)
+    postings = data_idx["postings"][lang]
+    docs = data_idx["docs"]
+    n_saints = data_idx["n_saints"]
+    lo, hi = {"saint":(0, n_saints), "feast":(n_saints, len(docs))}.get(type_filter, (0, len(docs)))
+
+    if not nq:
+        matches = range(lo, hi)
+    else:
+        matches = _type_slice(_matches(nq, postings), lo, hi)
+    total = len(matches)
+    want = offset + limit
+    if limit <= 0 or offset < 0 or offset >= total:
+        return {"total":total,"results":[]}
+    if not nq:
+        return {"total":total,"results":[_result(docs[i]) for i in matches[offset:want]]}
+
+    # Noms exacts puis préfixes : plages contiguës de la liste triée des noms
+    keys, name_ids = postings["name_keys"], postings["name_ids"]
+    start = bisect.bisect_left(keys, nq)
+    mid = bisect.bisect_right(keys, nq, start)
+    end = bisect.bisect_left(keys, nq + "\U0010ffff", mid)
+    exact = sorted(i for i in name_ids[start:mid] if lo <= i < hi)
+    if end - mid <= PREFIX_SORT_MAX:
+        prefix = heapq.nsmallest(want, (i for i in name_ids[mid:end] if lo <= i < hi))
+    else:
+        # Préfixe très fréquent : les premiers résultats par id se trouvent vite dans les correspondances
+        names = postings["names"]
+        prefix = list(itertools.islice((i for i in matches if names[i] != nq and names[i].startswith(nq)), want))
+    page = exact + prefix
+    if len(page) < want:
+        # Sous-chaînes ailleurs : les documents déjà classés par leur nom sont exclus
+        named = set(name_ids[start:end])
+        page.extend(itertools.islice((i for i in matches if i not in named), want - len(page)))
+    return {"total":total,"results":[_result(docs[i]) for i in page[offset:want]]}
@@ -0,0 +1,233 @@
+# app/snapshot.py
+import array, dataclasses, hashlib, json, mmap, os, pathlib, struct, sys
+from typing import Any, Dict, List, Optional, Tuple
+from . import search_index
+from . import validation
+from .models import Saint
+
+# Format : MAGIC | longueur de l'en-tête (uint32) | en-tête JSON | blocs alignés sur 8 octets.
+# L'en-tête décrit chaque bloc : [position, taille, type] avec type "json", "u32" (entiers non signés
+# de 32 bits, ordre d'octets de la machine) ou "utf8" (chaînes concaténées). Aucun bloc n'est du code :
+# un snapshot altéré peut fausser les données servies, pas exécuter quoi que ce soit.
+SNAPSHOT_MAGIC = b"CCSNAP\x00\x01"
+FORMAT_VERSION = 5
+ALIGN = 8
+
+# Table des saints : une ligne de taille fixe par saint, `id` puis (position, longueur) dans le bloc
+# de chaînes pour chacun des autres champs du modèle ; NONE en longueur pour un champ à None
+SAINT_FIELDS = tuple(f.name for f in dataclasses.fields(Saint) if f.name != "id")
+SAINT_ROW = 1 + 2 * len(SAINT_FIELDS)
+NONE = 0xFFFFFFFF
+# Une cellule par jour copte, comme calendar_core.DayIndex
+CELLS = 13 * 30
+
+class SaintTable:
+    """Saints commémorés par jour copte, lus dans les blocs du snapshot (mmap) à la demande.
+
+    Les cellules sont un tableau CSR : les saints de la cellule i sont les lignes
+    refs[cells[i]:cells[i+1]] de la table des saints, dans l'ordre de daily_commemorations.
+    Seuls les saints d'un jour demandé deviennent des objets Python ; le reste demeure dans
+    le fichier, dont les pages sont partagées entre les processus qui l'ouvrent.
+    """
+    __slots__ = ("rows", "strings", "cells", "refs")
+
+    def __init__(self, rows: memoryview, strings: memoryview, cells: memoryview, refs: memoryview):
+        self.rows = rows
+        self.strings = strings
+        self.cells = cells
+        self.refs = refs
+
+    def __len__(self) -> int:
+        return len(self.rows) // SAINT_ROW
+
+    def saint(self, row: int) -> Saint:
+        r = self.rows[row * SAINT_ROW:(row + 1) * SAINT_ROW]
+        values = {}
+        for k, name in enumerate(SAINT_FIELDS):
+            offset, length = r[1 + 2 * k], r[2 + 2 * k]
+            values[name] = None if length == NONE else str(self.strings[offset:offset + length], "utf-8")
+        return Saint(id=r[0], **values)
+
+    def on(self, month: int, day: int) -> Tuple[Saint, ...]:
+        """Saints commémorés un jour copte (même interface que PostgresSource.saints_on)."""
+        i = (month - 1) * 30 + day - 1
+        return tuple(self.saint(row) for row in self.refs[self.cells[i]:self.cells[i + 1]])
+
+# --- Compilation ---
+
+def _saint_blocks(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Table des saints, blocs de chaînes et cellules des commémorations (mêmes règles que compile_day_index)."""
+    rows, strings, positions = array.array("I"), bytearray(), {}
+    by_id = {}
+    for s in data.get("saints", []):
+        saint = Saint.from_dict(s)
+        if not 0 <= saint.id < NONE:
+            raise ValueError(f"Snapshot : id de saint hors des entiers 32 bits pris en charge ({saint.id}).")
+        rows.append(saint.id)
+        for name in SAINT_FIELDS:
+            value = getattr(saint, name)
+            if value is None:
+                rows.extend((0, NONE))
+                continue
+            raw = value.encode("utf-8")
+            # Chaînes répétées (type, fiabilité...) stockées une seule fois
+            if raw not in positions:
+                positions[raw] = len(strings)
+                strings += raw
+            rows.extend((positions[raw], len(raw)))
+        # Comme compile_day_index : à id égal, la dernière fiche l'emporte
+        by_id[saint.id] = len(rows) // SAINT_ROW - 1
+
+    per_cell: List[List[int]] = [[] for _ in range(CELLS)]
+    for comm in data.get("daily_commemorations", []):
+        day, month = comm["jour_copte"], comm["mois_copte"]
+        if 1 <= month <= 13 and 1 <= day <= 30:
+            per_cell[(month - 1) * 30 + day - 1].extend(by_id[i] for i in comm["liste_saints"] if i in by_id)
+    cells, refs = array.array("I", [0]), array.array("I")
+    for rows_of_day in per_cell:
+        refs.extend(rows_of_day)
+        cells.append(len(refs))
+    return {"saint_rows": rows, "saint_strings": bytes(strings), "saint_cells": cells, "saint_refs": refs}
+
+def _search_blocks(idx: Dict[str, Any]) -> Dict[str, Any]:
+    """Documents de l'index de recherche (JSON) et postings de chaque langue (tableaux)."""
+    blocks: Dict[str, Any] = {}
+    keys = {}
+    for lang, p in idx["postings"].items():
+        keys[lang] = list(p["grams"])
+        offsets, ids = array.array("I", [0]), array.array("I")
+        for g in keys[lang]:
+            ids.extend(p["grams"][g])
+            offsets.append(len(ids))
+        blocks[f"search_{lang}_offsets"] = offsets
+        blocks[f"search_{lang}_ids"] = ids
+        blocks[f"search_{lang}_names"] = array.array("I", p["name_ids"])
+    blocks["search"] = {"docs": idx["docs"], "n_saints": idx["n_saints"], "grams": keys}
+    return blocks
+
+def _header(source: bytes, data: Dict[str, Any], validated: Optional[str]) -> Dict[str, Any]:
+    return {
+        "format": FORMAT_VERSION,
+        "version": data.get("version"),
+        "source_sha256": hashlib.sha256(source).hexdigest(),
+        "byteorder": sys.byteorder,
+        # Signature du validateur passé, ou None : le snapshot n'est alors pas servi (voir JsonSource.load)
+        "validated": validated,
+    }
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+def _encode(value: Any) -> Tuple[bytes, str]:
+    if isinstance(value, array.array):
+        return value.tobytes(), "u32"
+    if isinstance(value, bytes):
+        return value, "utf8"
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), "json"
+
+def compile_snapshot(json_path: str, out_path: str, validator: Optional[validation.DataValidator] = None) -> Dict[str, Any]:
+    """Compile master_data.json en snapshot (table des saints par jour et index de recherche en tableaux).
+
+    Les données sont d'abord validées par `validator` s'il est fourni (ValueError en cas d'erreur).
+    Le fichier est écrit de façon atomique (jamais modifié en place : les processus qui l'ont
+    projeté en mémoire gardent l'ancien) et l'en-tête est renvoyé.
+    """
+    source = pathlib.Path(json_path).read_bytes()
+    data = json.loads(source)
+    if validator is not None:
+        validator.run(data).raise_for_errors()
+    # Les saints et commémorations ne sont que dans leurs tableaux, comme pour le backend postgres
+    blocks = {"data": {k: v for k, v in data.items() if k not in ("saints", "daily_commemorations")}}
+    blocks.update(_saint_blocks(data))
+    blocks.update(_search_blocks(search_index.build_indices(data)))
+
+    header = _header(source, data, validator.signature if validator is not None else None)
+    encoded = {name: _encode(value) for name, value in blocks.items()}
+    layout, position = {}, 0
+    for name, (raw, kind) in encoded.items():
+        layout[name] = (position, len(raw), kind)
+        position += _aligned(len(raw))
+    # Les positions absolues des blocs dépendent de la taille de l'en-tête qui les contient :
+    # on agrandit la place réservée jusqu'à ce qu'il y tienne
+    base = 0
+    while True:
+        header["blocks"] = {name: [base + p, n, kind] for name, (p, n, kind) in layout.items()}
+        raw_header = json.dumps(header).encode("utf-8")
+        needed = _aligned(len(SNAPSHOT_MAGIC) + 4 + len(raw_header))
+        if needed <= base:
+            break
+        base = needed
+    raw_header += b" " * (base - len(SNAPSHOT_MAGIC) - 4 - len(raw_header))
+
+    tmp = f"{out_path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack("<I", len(raw_header)) + raw_header)
+        for raw, _ in encoded.values():
+            f.write(raw + b"\0" * (_aligned(len(raw)) - len(raw)))
+    os.replace(tmp, out_path)
+    return header
+
+# --- Chargement ---
+
+def _read_header(path: str):
+    try:
+        with open(path, "rb") as f:
+            prefix = f.read(len(SNAPSHOT_MAGIC) + 4)
+            if len(prefix) < len(SNAPSHOT_MAGIC) + 4 or not prefix.startswith(SNAPSHOT_MAGIC):
+                return None
+            (n,) = struct.unpack("<I", prefix[len(SNAPSHOT_MAGIC):])
+            return json.loads(f.read(n))
+    except (OSError, ValueError):
+        return None
+
+def _decode(raw: memoryview, kind: str) -> Any:
+    if kind == "u32":
+        return raw.cast("I")
+    if kind == "json":
+        return json.loads(bytes(raw))
+    return raw
+
+def load_snapshot(path: str, json_path: str) -> Optional[Dict[str, Any]]:
+    """Charge un snapshot s'il est à jour par rapport à `json_path`, sinon renvoie None.
+
+    Le fichier est projeté en mémoire (mmap) : les tableaux (saints, commémorations, postings
+    de recherche) sont lus en place via memoryview, sans copie ni désérialisation, et leurs pages
+    sont partagées entre les workers. Seuls les blocs JSON (données de configuration, documents
+    de recherche) sont décodés. Les données renvoyées n'ont ni `saints` ni `daily_commemorations` :
+    les saints d'un jour se lisent dans la table `saints` (SaintTable).
+    """
+    header = _read_header(path)
+    if header is None or header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        return None
+    try:
+        source = pathlib.Path(json_path).read_bytes()
+    except OSError:
+        return None
+    if hashlib.sha256(source).hexdigest() != header.get("source_sha256"):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(mm)
+    blocks = {}
+    for name, (offset, length, kind) in header.get("blocks", {}).items():
+        if offset % ALIGN or offset + length > len(mm):
+            return None
+        blocks[name] = _decode(view[offset:offset + length], kind)
+
+    search = blocks["search"]
+    langs = search["grams"]
+    grams = {}
+    for lang, keys in langs.items():
+        offsets, ids = blocks[f"search_{lang}_offsets"], blocks[f"search_{lang}_ids"]
+        grams[lang] = {g: ids[offsets[j]:offsets[j + 1]] for j, g in enumerate(keys)}
+    return {
+        "header": header,
+        "data": blocks["data"],
+        "saints": SaintTable(blocks["saint_rows"], blocks["saint_strings"], blocks["saint_cells"], blocks["saint_refs"]),
+        "search_index": search_index.restore_indices(search["docs"], search["n_saints"], grams,
+                                                     {lang: blocks[f"search_{lang}_names"] for lang in langs}),
+    }
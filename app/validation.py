@@ -0,0 +1,332 @@
+# app/validation.py
+import dataclasses, hashlib, json, pathlib, time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import jsonschema
+from . import calendar_core as cc
+
+# Format de l'état mémorisé entre deux exécutions ; à incrémenter quand les vérifications changent
+STATE_FORMAT = 1
+# Années sur lesquelles on vérifie que les périodes de jeûne se résolvent
+SAMPLE_YEARS = range(1900, 2101)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Issue:
+    """Problème détecté dans les données ; `path` désigne l'élément fautif (ex. ("saints", 12, "id"))."""
+    severity: str  # "error" ou "warning"
+    check: str
+    message: str
+    path: Tuple[Any, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"severity": self.severity, "check": self.check, "message": self.message, "path": list(self.path)}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Issue":
+        return cls(d["severity"], d["check"], d["message"], tuple(d["path"]))
+
+def item_hash(value: Any) -> str:
+    """Empreinte courte d'un élément de section (mémorisée par élément valide)."""
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+def section_hash(value: Any) -> Optional[str]:
+    """Empreinte du contenu d'une section (indépendante de l'ordre des clés), None si elle est absente."""
+    if value is None:
+        return None
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# --- Vérifications référentielles ---
+
+# nom -> (sections dont dépend la vérification, fonction)
+CHECKS: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Iterable[Issue]]]] = {}
+
+def check(name: str, *sections: str):
+    """Enregistre une vérification, relancée seulement si l'une de ses sections a changé."""
+    def register(fn):
+        CHECKS[name] = (sections, fn)
+        return fn
+    return register
+
+def _items(data: Dict[str, Any], section: str) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    # Les éléments mal formés sont signalés par le schéma : on les ignore ici
+    value = data.get(section)
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, dict):
+                yield i, item
+
+def _duplicates(name: str, keyed: Iterable[Tuple[Any, Tuple[Any, ...]]], what: str) -> Iterable[Issue]:
+    first: Dict[Any, Tuple[Any, ...]] = {}
+    for key, path in keyed:
+        if key in first:
+            yield Issue("error", name, f"{what} dupliqué : {key!r} (déjà en {list(first[key])})", path)
+        else:
+            first[key] = path
+
+def coptic_day_valid(day: Any, month: Any, monthly: bool = False) -> bool:
+    """Le jour copte existe-t-il (au moins une année bissextile) ; `monthly` : mois 0 = tous les mois."""
+    if not isinstance(day, int) or not isinstance(month, int):
+        return False
+    if monthly and month == 0:
+        return 1 <= day <= 30
+    return 1 <= month <= 13 and 1 <= day <= (6 if month == 13 else 30)
+
+@check("duplicate_saint_ids", "saints")
+def check_saint_ids(data):
+    return _duplicates("duplicate_saint_ids", ((s.get("id"), ("saints", i, "id")) for i, s in _items(data, "saints")), "ID de saint")
+
+@check("duplicate_feast_codes", "feasts_fixed", "feasts_movable", "paramon_rules")
+def check_feast_codes(data):
+    # Les codes du Paramon apparaissent dans les fêtes du jour comme ceux des autres fêtes
+    keyed = [(f.get("code"), (section, i, "code")) for section in ("feasts_fixed", "feasts_movable") for i, f in _items(data, section)]
+    rules = data.get("paramon_rules")
+    keyed += [(code, ("paramon_rules", code)) for code in (rules if isinstance(rules, dict) else {})]
+    return _duplicates("duplicate_feast_codes", keyed, "Code de fête")
+
+@check("duplicate_fasting_codes", "fasting_periods")
+def check_fasting_codes(data):
+    return _duplicates("duplicate_fasting_codes", ((fp.get("code"), ("fasting_periods", i, "code")) for i, fp in _items(data, "fasting_periods")), "Code de période de jeûne")
+
+@check("unknown_saints", "saints", "daily_commemorations")
+def check_unknown_saints(data):
+    known = {s.get("id") for _, s in _items(data, "saints")}
+    for i, c in _items(data, "daily_commemorations"):
+        ids = c.get("liste_saints")
+        for j, sid in enumerate(ids if isinstance(ids, list) else []):
+            if sid not in known:
+                yield Issue("error", "unknown_saints", f"Saint inexistant {sid!r} dans la commémoration du {c.get('jour_copte')}/{c.get('mois_copte')}",
+                            ("daily_commemorations", i, "liste_saints", j))
+
+@check("uncommemorated_saints", "saints", "daily_commemorations")
+def check_uncommemorated_saints(data):
+    listed = {sid for _, c in _items(data, "daily_commemorations") if isinstance(c.get("liste_saints"), list) for sid in c["liste_saints"]}
+    missing = [s.get("id") for _, s in _items(data, "saints") if s.get("id") not in listed]
+    if missing:
+        yield Issue("warning", "uncommemorated_saints", f"{len(missing)} saints n'ont pas de commémoration journalière (ex: {missing[:5]})", ("saints",))
+
+@check("duplicate_commemoration_days", "daily_commemorations")
+def check_commemoration_days(data):
+    first: Dict[Tuple[Any, Any], int] = {}
+    for i, c in _items(data, "daily_commemorations"):
+        key = (c.get("jour_copte"), c.get("mois_copte"))
+        if key in first:
+            yield Issue("warning", "duplicate_commemoration_days", f"Jour {key[0]}/{key[1]} déjà commémoré (index {first[key]}) : les listes sont cumulées",
+                        ("daily_commemorations", i))
+        else:
+            first[key] = i
+
+def _coptic_dates(name: str, section: str, monthly: bool = False):
+    def run(data):
+        for i, item in _items(data, section):
+            if not coptic_day_valid(item.get("jour_copte"), item.get("mois_copte"), monthly):
+                label = item.get("code", item.get("id", i))
+                yield Issue("error", name, f"Date copte introuvable {item.get('jour_copte')}/{item.get('mois_copte')} ({label})", (section, i))
+    check(name, section)(run)
+
+_coptic_dates("coptic_dates_feasts", "feasts_fixed", monthly=True)
+_coptic_dates("coptic_dates_saints", "saints", monthly=True)
+_coptic_dates("coptic_dates_commemorations", "daily_commemorations")
+
+@check("fasting_periods_resolvable", "fasting_periods")
+def check_fasting_periods(data):
+    """Chaque borne doit être d'un type connu et se résoudre ; une fin relative toujours avant le début est signalée."""
+    for i, fp in _items(data, "fasting_periods"):
+        code = fp.get("code")
+        kinds = [fp.get("debut_type"), fp.get("fin_type")]
+        unknown = [k for k in kinds if k not in ("relative_to_pascha", "fixed_coptic")]
+        if unknown:
+            yield Issue("error", "fasting_periods_resolvable", f"{code} : type de borne inconnu {unknown[0]!r}", ("fasting_periods", i))
+            continue
+        if code == "FIFTY_DAYS":
+            continue  # calculée directement à partir de Pâques
+        resolved = applied = 0
+        try:
+            for year in SAMPLE_YEARS:
+                bounds = cc.fasting_period_bounds(fp, year)
+                resolved += bool(bounds)
+                applied += any(start <= end for start, end in bounds)
+        except (ValueError, KeyError, TypeError) as err:
+            yield Issue("error", "fasting_periods_resolvable", f"{code} : bornes non résolubles ({err!r})", ("fasting_periods", i))
+            continue
+        if not resolved:
+            yield Issue("error", "fasting_periods_resolvable", f"{code} : bornes non résolubles ({SAMPLE_YEARS[0]}-{SAMPLE_YEARS[-1]})", ("fasting_periods", i))
+            continue
+        if not applied:
+            yield Issue("warning", "fasting_periods_resolvable",
+                        f"{code} : la fin (relative à Pâques) précède le début chaque année ({SAMPLE_YEARS[0]}-{SAMPLE_YEARS[-1]}), période jamais appliquée", ("fasting_periods", i))
+
+@check("paramon_rules", "paramon_rules", "feasts_fixed", "feasts_movable")
+def check_paramon_rules(data):
+    rules = data.get("paramon_rules")
+    codes = {f.get("code") for section in ("feasts_fixed", "feasts_movable") for _, f in _items(data, section)}
+    for code, cfg in (rules.items() if isinstance(rules, dict) else ()):
+        if not isinstance(cfg, dict):
+            yield Issue("error", "paramon_rules", f"{code} : règle mal formée", ("paramon_rules", code))
+            continue
+        if cfg.get("feast_code") not in codes:
+            yield Issue("error", "paramon_rules", f"{code} : fête inconnue {cfg.get('feast_code')!r}", ("paramon_rules", code, "feast_code"))
+        if not coptic_day_valid(cfg.get("feast_day"), cfg.get("feast_month")):
+            yield Issue("error", "paramon_rules", f"{code} : date copte introuvable {cfg.get('feast_day')}/{cfg.get('feast_month')}", ("paramon_rules", code))
+        mapping = cfg.get("mapping")
+        if not isinstance(mapping, dict):
+            yield Issue("error", "paramon_rules", f"{code} : 'mapping' manquant", ("paramon_rules", code, "mapping"))
+            continue
+        for day, offsets in mapping.items():
+            if day not in cc.WEEKDAY_MAP:
+                yield Issue("error", "paramon_rules", f"{code} : jour de semaine inconnu {day!r}", ("paramon_rules", code, "mapping", day))
+            elif not isinstance(offsets, list) or not all(isinstance(o, int) for o in offsets):
+                yield Issue("error", "paramon_rules", f"{code} : décalages invalides pour {day}", ("paramon_rules", code, "mapping", day))
+
+# --- Moteur ---
+
+@dataclasses.dataclass
+class Report:
+    """Résultat d'une validation ; `state` se repasse à la validation suivante pour ne revérifier que les sections modifiées."""
+    issues: List[Issue]
+    checked: List[str]
+    reused: List[str]
+    elapsed: float
+    state: Dict[str, Any]
+
+    @property
+    def errors(self) -> List[Issue]:
+        return [i for i in self.issues if i.severity == "error"]
+
+    @property
+    def warnings(self) -> List[Issue]:
+        return [i for i in self.issues if i.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_for_errors(self) -> None:
+        """Lève ValueError décrivant la première erreur, s'il y en a."""
+        errors = self.errors
+        if errors:
+            more = f" (+{len(errors) - 1} autre(s))" if len(errors) > 1 else ""
+            raise ValueError(f"Données invalides : {errors[0].message} (chemin : {list(errors[0].path)}){more}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ok": self.ok, "errors": len(self.errors), "warnings": len(self.warnings),
+                "checked": self.checked, "reused": self.reused, "elapsed_ms": round(self.elapsed * 1000, 3),
+                "sections": self.state["sections"], "issues": [i.to_dict() for i in self.issues]}
+
+class DataValidator:
+    """Validation des données maîtres : schéma JSON section par section, puis vérifications référentielles.
+
+    Le validateur du schéma est compilé une fois par instance. Chaque vérification dépend d'un
+    ensemble de sections ; d'une exécution à l'autre (état passé à `run`), seules celles dont
+    une section a changé d'empreinte sont relancées, les autres reprennent leurs résultats.
+    Dans une section tableau modifiée, seuls les éléments dont l'empreinte n'était pas déjà
+    connue comme valide repassent le schéma (le plus coûteux sur un grand catalogue).
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Any]] = None):
+        self.schema = schema
+        self.schema_hash = section_hash(schema)
+        # Identifie les vérifications faites (format et schéma) : marqueur des snapshots validés à la compilation
+        self.signature = f"{STATE_FORMAT}:{self.schema_hash}"
+        self._root = None
+        # section -> (validateur de la section hors éléments, validateur d'un élément ou None)
+        self._sections: Dict[str, Tuple[Any, Any]] = {}
+        if schema is not None:
+            cls = jsonschema.validators.validator_for(schema)
+            properties = schema.get("properties", {})
+            split = {k for k, sub in properties.items() if isinstance(sub, dict) and isinstance(sub.get("items"), dict)}
+            # Racine : type, clés requises... sans redescendre dans les sections (vérifiées à part)
+            self._root = cls({**schema, "properties": {k: True for k in properties}})
+            # Les sections sont atteintes par $ref depuis la racine, pas extraites : leurs propres $ref
+            # (#/$defs/..., ou relatifs à un $id de la section) se résolvent comme dans le schéma complet.
+            # Sections tableau : la section hors éléments, puis un élément seul
+            outer = cls({**schema, "properties": {k: {**sub, "items": True} if k in split else sub for k, sub in properties.items()}})
+            items = cls(schema)
+            for section, sub in properties.items():
+                pointer = "#/properties/" + section.replace("~", "~0").replace("/", "~1")
+                item_validator = None
+                if section in split:
+                    # Sans $id sur le chemin, l'élément se valide directement (le $ref coûte une indirection par élément)
+                    scoped = any("$id" in s or "id" in s for s in (sub, sub["items"]))
+                    item_validator = items.evolve(schema={"$ref": pointer + "/items"} if scoped else sub["items"])
+                self._sections[section] = (outer.evolve(schema={"$ref": pointer}), item_validator)
+
+    @classmethod
+    def from_file(cls, schema_path: Optional[str]) -> "DataValidator":
+        """Validateur du schéma `schema_path` ; sans schéma (None), seules les vérifications référentielles sont faites."""
+        if schema_path is None:
+            return cls(None)
+        return cls(json.loads(pathlib.Path(schema_path).read_text(encoding="utf-8")))
+
+    @staticmethod
+    def _errors(validator, instance: Any, name: str, prefix: Tuple[Any, ...]) -> List[Issue]:
+        return [Issue("error", name, e.message, prefix + tuple(e.absolute_path)) for e in validator.iter_errors(instance)]
+
+    def _check_section(self, section: str, value: Any, digests: Optional[List[str]], known: set, valid: set) -> List[Issue]:
+        """Schéma d'une section ; les éléments d'empreinte connue (`known`) sont sautés, les valides ajoutés à `valid`."""
+        name = f"schema:{section}"
+        outer, item_validator = self._sections[section]
+        issues = self._errors(outer, value, name, (section,))
+        if item_validator is None or digests is None:
+            return issues
+        for i, (item, digest) in enumerate(zip(value, digests)):
+            if digest in known:
+                valid.add(digest)
+                continue
+            found = self._errors(item_validator, item, name, (section, i))
+            if found:
+                issues += found
+            else:
+                valid.add(digest)
+        return issues
+
+    def run(self, data: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> Report:
+        """Valide `data` ; `previous` est l'état d'un rapport précédent (même schéma) ou None pour tout vérifier."""
+        t = time.perf_counter()
+        empty = {"format": STATE_FORMAT, "schema": self.schema_hash, "sections": {}, "checks": {}, "valid_items": {}}
+        if not isinstance(data, dict):
+            issue = Issue("error", "schema", "Les données maîtres doivent être un objet JSON.")
+            return Report([issue], ["schema"], [], time.perf_counter() - t, empty)
+        if previous is None or previous.get("format") != STATE_FORMAT or previous.get("schema") != self.schema_hash:
+            previous = empty
+
+        # Empreintes : une par élément pour les tableaux (la section hache la suite des empreintes)
+        sections = sorted(set(self._sections) | {s for deps, _ in CHECKS.values() for s in deps})
+        hashes: Dict[str, Optional[str]] = {}
+        digests: Dict[str, List[str]] = {}
+        for s in sections:
+            value = data.get(s)
+            if isinstance(value, list):
+                digests[s] = [item_hash(item) for item in value]
+                hashes[s] = hashlib.sha256("".join(digests[s]).encode("ascii")).hexdigest()
+            else:
+                hashes[s] = section_hash(value)
+        state = {**empty, "sections": hashes, "checks": {}, "valid_items": {}}
+
+        issues: List[Issue] = []
+        checked, reused = [], []
+
+        def run_check(name: str, key: List[Any], fn: Callable[[], Iterable[Issue]]) -> None:
+            cached = previous["checks"].get(name)
+            if cached is not None and cached["key"] == key:
+                found = [Issue.from_dict(d) for d in cached["issues"]]
+                reused.append(name)
+            else:
+                found = list(fn())
+                checked.append(name)
+            state["checks"][name] = {"key": key, "issues": [i.to_dict() for i in found]}
+            issues.extend(found)
+
+        if self._root is not None:
+            # La racine ne dépend que de la liste des clés
+            run_check("schema", [section_hash(sorted(data))], lambda: self._errors(self._root, data, "schema", ()))
+        for section in self._sections:
+            known = set(previous["valid_items"].get(section, ()))
+            valid: set = set()
+            run_check(f"schema:{section}", [hashes[section]],
+                      lambda: self._check_section(section, data[section], digests.get(section), known, valid) if section in data else ())
+            # Section reprise telle quelle : ses éléments valides le restent
+            state["valid_items"][section] = sorted(valid if f"schema:{section}" in checked else known)
+        for name, (deps, fn) in CHECKS.items():
+            run_check(name, [hashes[s] for s in deps], lambda: fn(data))
+        return Report(issues, checked, reused, time.perf_counter() - t, state)
@@ -0,0 +1,70 @@
+# app/workers.py
+import asyncio, concurrent.futures, threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class PoolBusy(Exception):
+    """File du pool pleine : la requête doit être refusée (503) plutôt que d'allonger l'attente."""
+
+class WorkerPool:
+    """Pool borné pour les constructions coûteuses (années, plages, lots), séparé du threadpool par défaut.
+
+    Au plus `workers` calculs tournent en même temps et `max_pending` sont admis (en cours ou en
+    attente) : au-delà, `run` lève PoolBusy (contre-pression) et les requêtes légères gardent
+    leurs threads. Des requêtes identiques simultanées (même clé) partagent un seul calcul.
+    Des threads plutôt que des processus : le calcul lit directement le jeu de données courant,
+    remplacé en mémoire lors d'un rechargement à chaud.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        # Créé au premier calcul, et de nouveau après shutdown (cycles de vie successifs de l'application)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        # (boucle, clé) -> calcul en cours ; un Future asyncio n'est attendable que depuis sa boucle
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "coalesced": 0, "rejected": 0}
+
+    def busy(self) -> bool:
+        return len(self._inflight) >= self.max_pending
+
+    async def run(self, key: Hashable, fn: Callable[[], Any], queue_when_full: bool = False) -> Any:
+        """Exécute `fn()` dans le pool, ou rejoint le calcul en cours de même clé.
+
+        `queue_when_full` : attend même si la file est pleine (suite d'une réponse déjà admise).
+        """
+        loop = asyncio.get_running_loop()
+        k = (loop, key)
+        with self._lock:
+            fut = self._inflight.get(k)
+            if fut is not None:
+                self._stats["coalesced"] += 1
+            else:
+                if len(self._inflight) >= self.max_pending and not queue_when_full:
+                    self._stats["rejected"] += 1
+                    raise PoolBusy()
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="heavy")
+                fut = loop.run_in_executor(self._executor, fn)
+                self._inflight[k] = fut
+                self._stats["submitted"] += 1
+                fut.add_done_callback(lambda f: self._release(k, f))
+        # shield : un client qui abandonne n'annule pas le calcul partagé avec les autres
+        return await asyncio.shield(fut)
+
+    def _release(self, k: Tuple[asyncio.AbstractEventLoop, Hashable], fut: asyncio.Future) -> None:
+        with self._lock:
+            if self._inflight.get(k) is fut:
+                del self._inflight[k]
+        if not fut.cancelled():
+            fut.exception()  # marque l'erreur comme lue si tous les demandeurs ont abandonné
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "max_pending": self.max_pending, "pending": len(self._inflight), **self._stats}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,53 +1,215 @@
 import argparse
+import concurrent.futures
+import datetime
+import gzip
+import hashlib
 import json
+import os
 import pathlib
 import sys
-import datetime
+
+try:
+    import brotli
+except ImportError:  # optionnel : seule la sortie --format br en a besoin
+    brotli = None
 
 # Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 from app import calendar_core as cc
+from app import response_cache
+
+# Extension des artefacts par format de sortie
+EXTENSIONS = {"json": ".json", "gzip": ".json.gz", "br": ".json.br"}
+MANIFEST_NAME = "manifest.json"
+
+def parse_years(spec):
+    """'2025' ou '1900-2200' -> liste d'années."""
+    first, _, last = spec.partition("-")
+    first, last = int(first), int(last or first)
+    if last < first:
+        raise ValueError(f"Plage d'années invalide : {spec}")
+    return list(range(first, last + 1))
+
+def encode_artifact(body, fmt):
+    """Compresse le JSON compact selon le format (gzip reproductible : mtime fixé à 0)."""
+    if fmt == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if fmt == "br":
+        return brotli.compress(body, quality=11)
+    return body
+
+def write_atomic(path, content):
+    """Écrit un fichier via un fichier temporaire voisin puis os.replace : jamais de fichier partiel visible."""
+    tmp = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+def sha256_file(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+# --- Génération en parallèle ---
+
+_WORKER_DATA = None
+
+def _init_worker(data_path):
+    """Initialisation d'un processus du pool : les données maîtres sont chargées une seule fois par worker."""
+    global _WORKER_DATA
+    _WORKER_DATA = cc.load_master(data_path)
+
+def build_artifact(year, lang, fmt, out_dir):
+    """Construit et écrit l'artefact d'une année et d'une langue ; renvoie son entrée de manifeste."""
+    body = response_cache.encode_json(cc.build_year_cache(_WORKER_DATA, year, lang))
+    content = encode_artifact(body, fmt)
+    name = f"year_{year}_{lang}{EXTENSIONS[fmt]}"
+    write_atomic(pathlib.Path(out_dir) / name, content)
+    return name, {"year": year, "lang": lang, "sha256": hashlib.sha256(content).hexdigest(), "bytes": len(content)}
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_fresh(manifest, entry_name, out_dir):
+    """Vrai si l'artefact figure au manifeste et que le fichier sur disque correspond toujours à son empreinte."""
+    entry = manifest["files"].get(entry_name)
+    path = out_dir / entry_name
+    return entry is not None and path.is_file() and sha256_file(path) == entry["sha256"]
+
+def generate_years(args):
+    """Mode années : génère year × langue en parallèle, avec manifeste et saut des artefacts à jour."""
+    try:
+        years = parse_years(args.years) if args.years else [args.year]
+    except ValueError as e:
+        print(f"Erreur : {e}")
+        sys.exit(1)
+    langs = list(dict.fromkeys(l.strip() for l in args.langs.split(",") if l.strip())) if args.langs else [args.lang]
+    bad = [l for l in langs if l not in ("ar", "fr")]
+    if bad:
+        print(f"Erreur : langue(s) non supportée(s) : {', '.join(bad)}")
+        sys.exit(1)
+    if args.format == "br" and brotli is None:
+        print("Erreur : le format 'br' nécessite le paquet 'brotli' (pip install brotli).")
+        sys.exit(1)
+
+    try:
+        # L'empreinte du fichier, pas seulement sa version : une correction sans changement de version invalide aussi les caches
+        data_sha256 = sha256_file(args.data)
+        version = cc.load_master(args.data).get("version")
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier de données '{args.data}' est introuvable.")
+        sys.exit(1)
+
+    out_dir = pathlib.Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    previous = None if args.force else load_manifest(manifest_path)
+    if previous is not None and (previous.get("data_sha256") != data_sha256 or previous.get("format_revision") != response_cache.FORMAT_REVISION):
+        previous = None
+    manifest = {"data_version": version, "data_sha256": data_sha256, "format_revision": response_cache.FORMAT_REVISION,
+                "files": dict(previous["files"]) if previous else {}}
+
+    todo, skipped = [], 0
+    for year in years:
+        for lang in langs:
+            name = f"year_{year}_{lang}{EXTENSIONS[args.format]}"
+            if previous is not None and is_fresh(previous, name, out_dir):
+                skipped += 1
+            else:
+                todo.append((year, lang))
+
+    print(f"--- Génération de {len(todo)} cache(s) annuel(s) ({years[0]}–{years[-1]}, {', '.join(langs)}, format {args.format}), "
+          f"{skipped} à jour ignoré(s), {args.workers} worker(s) ---")
+    if todo:
+        if args.workers <= 1:
+            _init_worker(args.data)
+            results = (build_artifact(y, l, args.format, out_dir) for y, l in todo)
+            for name, entry in results:
+                manifest["files"][name] = entry
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.data,)) as pool:
+                futures = [pool.submit(build_artifact, y, l, args.format, out_dir) for y, l in todo]
+                for fut in concurrent.futures.as_completed(futures):
+                    name, entry = fut.result()
+                    manifest["files"][name] = entry
+
+    manifest["files"] = dict(sorted(manifest["files"].items()))
+    write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    print(f"\nSuccès ! {len(todo)} fichier(s) écrit(s) dans : {out_dir} (manifeste : {manifest_path})")
+
+def write_ndjson(data, start, end, lang, fields, out):
+    """Écrit les jours de `start` à `end` en NDJSON dans le flux binaire `out`, sans tout garder en mémoire."""
+    n = 0
+    for day in cc.iter_days(data, start, end, lang, fields):
+        out.write(response_cache.encode_json(day) + b"\n")
+        n += 1
+    return n
+
+def export_range(args):
+    """Mode plage : exporte `--start`..`--end` en NDJSON (fichier dans `--out`, ou sortie standard si `--out -`)."""
+    try:
+        start, end = datetime.date.fromisoformat(args.start), datetime.date.fromisoformat(args.end)
+        fields = cc.parse_fields(args.fields)
+    except ValueError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        sys.exit(1)
+    if end < start:
+        print("Erreur : la date de fin doit être postérieure ou égale à la date de début.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        data = cc.load_master(args.data)
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier de données '{args.data}' est introuvable.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.out == "-":
+        write_ndjson(data, start, end, args.lang, fields, sys.stdout.buffer)
+        return
+
+    print(f"--- Export NDJSON du {start} au {end} en langue '{args.lang}' ---")
+    output_dir = pathlib.Path(args.out)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / f"range_{start}_{end}_{args.lang}.ndjson"
+    with open(output_file, "wb") as f:
+        n = write_ndjson(data, start, end, args.lang, fields, f)
+    print(f"\nSuccès ! {n} jours écrits dans : {output_file}")
 
 def main():
     """
-    Script pour pré-calculer et sauvegarder les données liturgiques
-    pour une année complète dans un fichier JSON.
+    Script pour pré-calculer et sauvegarder les données liturgiques : caches annuels
+    (une ou plusieurs années et langues, en parallèle) ou plage de dates en NDJSON.
     """
     parser = argparse.ArgumentParser(description="Génère un cache annuel des données liturgiques coptes.")
-    parser.add_argument("--year", type=int, required=True, help="L'année pour laquelle générer le cache (ex: 2025).")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--year", type=int, help="L'année pour laquelle générer le cache (ex: 2025).")
+    mode.add_argument("--years", help="Plage d'années à générer (ex: 1900-2200).")
+    mode.add_argument("--start", help="Début d'une plage à exporter en NDJSON (YYYY-MM-DD), avec --end.")
+    parser.add_argument("--end", help="Fin (incluse) de la plage exportée en NDJSON (YYYY-MM-DD).")
+    parser.add_argument("--fields", default="", help="Champs à exporter, séparés par des virgules (ex: jeune,date_copte).")
     parser.add_argument("--lang", default="ar", choices=["ar", "fr"], help="La langue du cache ('ar' ou 'fr').")
+    parser.add_argument("--langs", default="", help="Liste de langues séparées par des virgules (ex: ar,fr), remplace --lang.")
+    parser.add_argument("--format", default="json", choices=sorted(EXTENSIONS), help="Format des caches annuels : JSON compact, gzip ou brotli.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus de génération.")
+    parser.add_argument("--force", action="store_true", help="Régénère tout, même les caches à jour d'après le manifeste.")
     parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
-    parser.add_argument("--out", default="cache", help="Dossier de sortie pour le fichier de cache.")
+    parser.add_argument("--out", default="cache", help="Dossier de sortie pour le fichier de cache ('-' : sortie standard, mode plage).")
     args = parser.parse_args()
 
-    print(f"--- Génération du cache pour l'année {args.year} en langue '{args.lang}' ---")
+    if args.start is not None:
+        if args.end is None:
+            parser.error("--start nécessite --end")
+        export_range(args)
+        return
 
     try:
-        # Charger les données de base
-        data = cc.load_master(args.data)
-        
-        # Construire le cache pour l'année spécifiée
-        cache_content = cc.build_year_cache(data, args.year, args.lang)
-        
-        # Créer le dossier de sortie s'il n'existe pas
-        output_dir = pathlib.Path(args.out)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Définir le nom du fichier de sortie
-        output_file = output_dir / f"year_{args.year}_{args.lang}.json"
-        
-        # Écrire le cache dans le fichier JSON
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(cache_content, f, ensure_ascii=False, indent=2)
-            
-        print(f"\nSuccès ! Cache écrit dans : {output_file}")
-
-    except FileNotFoundError:
-        print(f"Erreur : Le fichier de données '{args.data}' est introuvable.")
-        sys.exit(1)
+        generate_years(args)
     except Exception as e:
         print(f"Une erreur inattendue est survenue : {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+
+import psycopg2
+
+# Les scripts voisins sont importables directement (dossier du script dans sys.path)
+import import_data
+from bench_search import synthetic_master
+
+SCHEMA = "bench_import"
+
+# Schéma minimal des tables importées, créé dans un schéma jetable
+DDL = """
+    CREATE TABLE feasts_fixed (code TEXT PRIMARY KEY, jour_copte INT, mois_copte INT, rang TEXT, titre_ar TEXT, titre_fr TEXT);
+    CREATE TABLE feasts_movable (code TEXT PRIMARY KEY, offset_jours INT, rang TEXT, titre_ar TEXT, titre_fr TEXT);
+    CREATE TABLE saints (id INT PRIMARY KEY, nom_ar TEXT, nom_fr TEXT, type TEXT, jour_copte INT, mois_copte INT, fiabilite TEXT);
+    CREATE TABLE daily_commemorations (id SERIAL PRIMARY KEY, jour_copte INT, mois_copte INT, liste_saints JSONB);
+    CREATE TABLE fasting_periods (code TEXT PRIMARY KEY, debut_type TEXT, debut_ref JSONB, fin_type TEXT, fin_ref JSONB, intensite TEXT);
+    CREATE TABLE paramon_rules (code TEXT PRIMARY KEY, feast_code TEXT, feast_day INT, feast_month INT, mapping JSONB);
+"""
+
+def reset_schema(conn):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA}; SET search_path TO {SCHEMA};")
+        cur.execute(DDL)
+    conn.commit()
+
+def run(conn, name, data, mode):
+    t = time.perf_counter()
+    stats = import_data.run_import(conn, data, mode)
+    elapsed = time.perf_counter() - t
+    rows = sum(s["rows"] for s in stats)
+    touched = sum(s["touched"] for s in stats)
+    print(f"{name:<28} {rows:>8} lignes  {touched:>8} modifiées  {elapsed * 1000:9.1f} ms  {rows / elapsed:>12,.0f} lignes/s")
+
+def main():
+    """Compare les modes d'import (une requête par ligne, bulk, incrémental) sur un catalogue synthétique."""
+    parser = argparse.ArgumentParser(description="Benchmark de scripts/import_data.py contre une base PostgreSQL.")
+    parser.add_argument("--dsn", required=True, help="Base de test (un schéma jetable 'bench_import' y est créé puis supprimé).")
+    parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
+    parser.add_argument("--saints", type=int, default=20000, help="Nombre de saints synthétiques.")
+    parser.add_argument("--change", type=float, default=0.01, help="Part des saints modifiés avant l'import incrémental.")
+    args = parser.parse_args()
+
+    data = synthetic_master(args.data, args.saints)
+    conn = psycopg2.connect(args.dsn)
+    try:
+        print(f"--- Import de {args.saints} saints ---")
+        reset_schema(conn)
+        run(conn, "rows (base vide)", data, "rows")
+
+        reset_schema(conn)
+        run(conn, "bulk (base vide)", data, "bulk")
+        run(conn, "bulk (sans changement)", data, "bulk")
+
+        rnd = random.Random(3)
+        for s in rnd.sample(data["saints"], max(1, int(len(data["saints"]) * args.change))):
+            s["nom_fr"] += " (révisé)"
+        run(conn, f"incremental ({args.change:.0%} modifiés)", data, "incremental")
+        run(conn, "incremental (sans changement)", data, "incremental")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        conn.commit()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import argparse
+import collections
+import pathlib
+import random
+import statistics
+import sys
+import time
+import unicodedata
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from app import calendar_core as cc
+from app import search_index
+
+AR_SYLLABLES = ["مر", "قس", "أنط", "ونيو", "س", "بو", "لا", "باخ", "ومي", "شنو", "ده", "مينا", "جر", "جس", "يوح", "نا", "إبرا", "هيم", "تاد", "رس"]
+FR_SYLLABLES = ["mar", "c", "an", "toi", "ne", "pa", "chô", "me", "shé", "nou", "da", "mi", "na", "geor", "ges", "jean", "ab", "ra", "ham", "é"]
+
+def synthetic_catalogue(n_saints, seed=42):
+    """Génère un jeu de données maître synthétique de `n_saints` saints (noms ar/fr aléatoires)."""
+    rnd = random.Random(seed)
+    saints = []
+    for i in range(1, n_saints + 1):
+        k = rnd.randint(2, 4)
+        saints.append({
+            "id": i,
+            "nom_ar": "القديس " + "".join(rnd.choice(AR_SYLLABLES) for _ in range(k)),
+            "nom_fr": "Saint " + "".join(rnd.choice(FR_SYLLABLES) for _ in range(k)).capitalize(),
+            "type": "قديس",
+            "jour_copte": rnd.randint(1, 30),
+            "mois_copte": rnd.randint(1, 12),
+            "resume_ar": " ".join("".join(rnd.choice(AR_SYLLABLES) for _ in range(3)) for _ in range(6)),
+            "fiabilite": rnd.choice(["elevee", "moyenne", "faible"]),
+        })
+    return {"version": "0.0.0", "saints": saints, "feasts_fixed": [], "feasts_movable": []}
+
+def synthetic_master(master_path, n_saints, seed=42):
+    """Données maîtres réelles (fêtes, jeûnes, Paramon) avec un catalogue synthétique de `n_saints` saints."""
+    data = cc.load_master(master_path)
+    data["saints"] = synthetic_catalogue(n_saints, seed)["saints"]
+    by_day = collections.defaultdict(list)
+    for s in data["saints"]:
+        by_day[(s["mois_copte"], s["jour_copte"])].append(s["id"])
+    data["daily_commemorations"] = [{"jour_copte": j, "mois_copte": m, "liste_saints": ids} for (m, j), ids in sorted(by_day.items())]
+    return data
+
+def linear_search(q, lang, data_idx, type_filter="all", limit=20, offset=0):
+    """Référence : l'ancien balayage linéaire par sous-chaîne sur tous les enregistrements."""
+    nq = (search_index.normalize_ar(q) if lang == "ar" else search_index.normalize_fr(q))
+    res = []
+    if type_filter in ("all", "saint"):
+        res.extend(s["id"] for s in data_idx["saints"] if nq in s[f"search_{lang}"])
+    if type_filter in ("all", "feast"):
+        res.extend(f["code"] for f in data_idx["feasts"] if nq in f[f"search_{lang}"])
+    return {"total": len(res), "results": res[offset:offset + limit]}
+
+def legacy_normalize_ar(s):
+    """Référence : ancienne normalisation arabe (table reconstruite à chaque appel, remplacements chaînés)."""
+    if not s: return ""
+    diac = "".join(chr(c) for c in range(0x0610, 0x061B)) + "".join(chr(c) for c in range(0x064B, 0x065F))
+    s = s.translate(str.maketrans("", "", diac))
+    return s.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا").replace("ة", "ه").replace("ى", "ي")
+
+def legacy_normalize_fr(s):
+    """Référence : ancienne normalisation française (NFD puis filtre par catégorie)."""
+    if not s: return ""
+    s = unicodedata.normalize("NFD", s)
+    return "".join(ch for ch in s if unicodedata.category(ch) != "Mn").lower()
+
+def bench_normalization(data, queries, repeat):
+    """Compare les normalisations (ancienne, tables, mémorisée) sur les requêtes et la construction de l'index."""
+    print("--- Normalisation ---")
+    def per_call(fn):
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            for q, lang in queries:
+                fn(q, lang)
+            best = min(best, time.perf_counter() - t)
+        return best / len(queries) * 1e6
+
+    old = per_call(lambda q, lang: legacy_normalize_ar(q) if lang == "ar" else legacy_normalize_fr(q))
+    new = per_call(lambda q, lang: search_index.normalize_ar(q) if lang == "ar" else search_index.normalize_fr(q))
+    search_index.normalize_query.cache_clear()
+    memo = per_call(search_index.normalize_query)
+    print(f"{'requête, ancienne':<22} {old:8.2f} µs")
+    print(f"{'requête, tables':<22} {new:8.2f} µs   (x{old / new:.1f})")
+    print(f"{'requête, mémorisée':<22} {memo:8.2f} µs   (x{old / memo:.1f})")
+
+    def build_ms():
+        t = time.perf_counter()
+        search_index.build_indices(data)
+        return (time.perf_counter() - t) * 1000
+    current = (search_index.normalize_ar, search_index.normalize_fr)
+    search_index.normalize_ar, search_index.normalize_fr = legacy_normalize_ar, legacy_normalize_fr
+    try:
+        old_build = build_ms()
+    finally:
+        search_index.normalize_ar, search_index.normalize_fr = current
+    new_build = build_ms()
+    print(f"{'index, ancienne':<22} {old_build:8.0f} ms")
+    print(f"{'index, tables':<22} {new_build:8.0f} ms")
+
+def timed(fn, queries, repeat):
+    """Latences (ms) de `fn` sur chaque requête, meilleure de `repeat` exécutions."""
+    out = []
+    for q, lang in queries:
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn(q, lang)
+            best = min(best, time.perf_counter() - t)
+        out.append(best * 1000)
+    return out
+
+def report(name, lat):
+    lat = sorted(lat)
+    print(f"{name:<22} p50={statistics.median(lat):8.3f} ms   p99={lat[int(len(lat) * 0.99) - 1]:8.3f} ms   max={lat[-1]:8.3f} ms")
+
+def main():
+    """Compare l'index n-grammes de search_index au balayage linéaire, et les normalisations, sur un catalogue synthétique."""
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche (index inversé contre balayage).")
+    parser.add_argument("--saints", type=int, default=10000, help="Nombre de saints synthétiques.")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes tirées du catalogue.")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions par requête (meilleur temps retenu).")
+    args = parser.parse_args()
+
+    data = synthetic_catalogue(args.saints)
+    t = time.perf_counter()
+    idx = search_index.build_indices(data)
+    print(f"--- {args.saints} saints, index construit en {(time.perf_counter() - t) * 1000:.0f} ms ---")
+
+    # Requêtes d'autocomplétion : préfixes (1 à 12 caractères) et noms complets existants
+    rnd = random.Random(7)
+    queries = []
+    for _ in range(args.queries):
+        s = rnd.choice(data["saints"])
+        lang = rnd.choice(["ar", "fr"])
+        name = s["nom_ar"] if lang == "ar" else s["nom_fr"]
+        queries.append((name[:rnd.randint(1, 12)], lang))
+    queries += [((s["nom_ar"] if lang == "ar" else s["nom_fr"]), lang) for s, lang in zip(rnd.sample(data["saints"], 20), ["ar", "fr"] * 10)]
+
+    for q, lang in queries:
+        assert search_index.search(q, lang, idx, limit=10 ** 9)["total"] == linear_search(q, lang, idx)["total"], q
+
+    def cold(q, lang):
+        idx["postings"][lang]["memo"].clear()
+        search_index.search(q, lang, idx)
+
+    report("balayage linéaire", timed(lambda q, lang: linear_search(q, lang, idx), queries, args.repeat))
+    report("index (sans mémo)", timed(cold, queries, args.repeat))
+    report("index (mémorisé)", timed(lambda q, lang: search_index.search(q, lang, idx), queries, args.repeat))
+    rare = [(q[len("Saint "):] if lang == "fr" else q[len("القديس "):], lang) for q, lang in queries]
+    rare = [(q, lang) for q, lang in rare if q]
+    report("index, sans titre", timed(cold, rare, args.repeat))
+
+    bench_normalization(data, queries, args.repeat)
+
+if __name__ == "__main__":
+    main()
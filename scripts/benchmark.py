@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import os
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import httpx
+except ImportError:  # optionnel : seul le test de charge en a besoin
+    httpx = None
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app import calendar_core as cc
+from app import search_index
+from bench_search import synthetic_master
+
+# Métriques comparées à la référence : (section, métrique, sens) ; sens +1 : plus petit est meilleur
+COMPARED = [("micro", "median_us", 1), ("load", "p50_ms", 1), ("load", "p99_ms", 1), ("load", "rps", -1)]
+
+# --- Micro-benchmarks ---
+
+def bench(fn, rounds, min_time):
+    """Mesure `fn()` à la manière de pytest-benchmark : itérations calibrées pour qu'un tour dure au
+    moins `min_time` secondes, puis `rounds` tours ; statistiques par appel, en microsecondes."""
+    iterations = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - t
+        if elapsed >= min_time or iterations >= 1 << 20:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call = []
+    for _ in range(rounds):
+        t = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - t) / iterations * 1e6)
+    return {
+        "min_us": min(per_call), "max_us": max(per_call), "mean_us": statistics.fmean(per_call),
+        "median_us": statistics.median(per_call), "stddev_us": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "rounds": rounds, "iterations": iterations, "ops": 1e6 / statistics.median(per_call),
+    }
+
+def cycling(values, call):
+    """Fonction sans argument appliquant `call` à chaque valeur tour à tour (entrées réparties sur les années)."""
+    it = itertools.cycle(values)
+    return lambda: call(next(it))
+
+def micro_benchmarks(data, idx, years, queries, rounds, min_time):
+    """Coût de chaque fonction du cœur, sur des entrées réparties sur `years`."""
+    rnd = random.Random(11)
+    dates = [datetime.date(y, rnd.randint(1, 12), rnd.randint(1, 28)) for y in years for _ in range(4)]
+    fixed = [(rnd.randint(1, 30), rnd.randint(1, 12), y) for y in years]
+
+    def cold_day(d):
+        cc.clear_year_cache()
+        cc.build_day(data, d)
+
+    def cold_search(q):
+        for p in idx["postings"].values():
+            p["memo"].clear()
+        search_index.search(q[0], q[1], idx)
+
+    cases = [
+        ("gregorian_to_coptic", cycling(dates, cc.gregorian_to_coptic), 1),
+        ("locate_fixed_coptic", cycling(fixed, lambda a: cc.locate_fixed_coptic(*a)), 1),
+        ("coptic_pascha_date", cycling(years, cc.coptic_pascha_date), 1),
+        ("compile_liturgical_year", cycling(years, lambda y: cc.compile_liturgical_year(data, y)), 1),
+        ("build_day (année en cache)", cycling(dates, lambda d: cc.build_day(data, d)), 1),
+        ("build_day (cache vidé)", cycling(dates, cold_day), 1),
+        ("build_year_cache", cycling(years, lambda y: cc.build_year_cache(data, y)), 1),
+        ("build_days (42 dates)", lambda: cc.build_days(data, dates[:42]), 1),
+        ("search (mémo vidé)", cycling(queries, cold_search), 1),
+        ("search (mémorisé)", cycling(queries, lambda q: search_index.search(q[0], q[1], idx)), 1),
+        ("compile_day_index", lambda: cc.compile_day_index(data), 4),
+        ("build_indices", lambda: search_index.build_indices(data), 4),
+    ]
+    # Les années de l'échantillon tiennent dans le cache : build_day mesure alors le chemin chaud
+    for y in years:
+        cc.liturgical_year(data, y)
+
+    results = {}
+    for name, fn, slow in cases:
+        results[name] = bench(fn, max(3, rounds // slow), min_time)
+        r = results[name]
+        print(f"{name:<28} médiane {r['median_us']:>12.2f} µs   min {r['min_us']:>12.2f} µs   ±{r['stddev_us']:>10.2f}   ({r['ops']:,.0f} op/s)")
+    cc.clear_year_cache()
+    return results
+
+# --- Test de charge HTTP en processus (ASGI) ---
+
+async def load_endpoint(client, paths, concurrency):
+    """Envoie `paths` avec `concurrency` requêtes simultanées ; latences en ms."""
+    queue = collections.deque(paths)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            path = queue.popleft()
+            t = time.perf_counter()
+            r = await client.get(path)
+            latencies.append((time.perf_counter() - t) * 1000)
+            if r.status_code != 200:
+                errors += 1
+
+    t = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t
+    latencies.sort()
+    return {
+        "requests": len(latencies), "errors": errors, "concurrency": concurrency,
+        "p50_ms": statistics.median(latencies), "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "max_ms": latencies[-1], "rps": len(latencies) / elapsed,
+    }
+
+def load_test(data, n_requests, concurrency, years):
+    """Charge /day, /search et /year sur l'application FastAPI, sans réseau (httpx.ASGITransport)."""
+    # L'application lit sa configuration à l'import : données synthétiques, ni snapshot ni sondage
+    tmp = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8")
+    with tmp:
+        json.dump(data, tmp, ensure_ascii=False)
+    os.environ.update(MASTER_DATA_PATH=tmp.name, MASTER_SNAPSHOT_PATH=tmp.name + ".snap", DATA_VERSION_POLL_SECONDS="0")
+    try:
+        from app.main import app
+    finally:
+        os.unlink(tmp.name)
+
+    rnd = random.Random(5)
+    names = [s["nom_fr"] for s in data["saints"]]
+    plans = {
+        "/day": [f"/day?date={datetime.date(rnd.choice(years), rnd.randint(1, 12), rnd.randint(1, 28))}&lang={rnd.choice(['ar', 'fr'])}" for _ in range(n_requests)],
+        "/search": [f"/search?q={rnd.choice(names)[:rnd.randint(3, 10)]}&lang=fr" for _ in range(n_requests)],
+        "/year": [f"/year?year={rnd.choice(years)}&lang={rnd.choice(['ar', 'fr'])}" for _ in range(max(1, n_requests // 10))],
+    }
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            return {name: await load_endpoint(client, paths, concurrency) for name, paths in plans.items()}
+
+    results = asyncio.run(run())
+    for name, r in results.items():
+        print(f"{name:<10} {r['requests']:>6} requêtes   p50 {r['p50_ms']:8.2f} ms   p99 {r['p99_ms']:8.2f} ms   {r['rps']:9.0f} req/s   erreurs {r['errors']}")
+    return results
+
+# --- Résultats et comparaison ---
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), "commit": commit,
+        "python": platform.python_version(), "platform": platform.platform(), "saints": args.saints, "years": args.years,
+    }
+
+def compare(results, baseline, threshold):
+    """Affiche les écarts avec une exécution de référence ; renvoie le nombre de régressions au-delà de `threshold`."""
+    print(f"\n--- Comparaison avec la référence ({baseline['meta'].get('commit')}, {baseline['meta'].get('date')}) ---")
+    regressions = 0
+    for section, metric, direction in COMPARED:
+        for name, r in results.get(section, {}).items():
+            old = baseline.get(section, {}).get(name, {}).get(metric)
+            if not old or metric not in r:
+                continue
+            ratio = (r[metric] / old) if direction > 0 else (old / r[metric])
+            flag = "RÉGRESSION" if ratio > threshold else ("mieux" if ratio < 1 / threshold else "")
+            regressions += ratio > threshold
+            print(f"{section:<6} {name + ' ' + metric:<40} {old:>12.2f} -> {r[metric]:>12.2f}   x{ratio:5.2f}  {flag}")
+    return regressions
+
+def main():
+    """Benchmarks du cœur du calendrier et test de charge des endpoints, résultats en JSON comparables."""
+    parser = argparse.ArgumentParser(description="Benchmarks de calendar_core, search_index et des endpoints HTTP.")
+    parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
+    parser.add_argument("--saints", type=int, default=10000, help="Taille du catalogue synthétique (ex: 10000 à 100000).")
+    parser.add_argument("--years", default="1900-2200", help="Plage d'années échantillonnée (ex: 1900-2200).")
+    parser.add_argument("--rounds", type=int, default=20, help="Tours par micro-benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.005, help="Durée minimale d'un tour (secondes).")
+    parser.add_argument("--requests", type=int, default=2000, help="Requêtes par endpoint pour le test de charge.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requêtes simultanées pour le test de charge.")
+    parser.add_argument("--skip-micro", action="store_true", help="Ne lance pas les micro-benchmarks.")
+    parser.add_argument("--skip-load", action="store_true", help="Ne lance pas le test de charge HTTP.")
+    parser.add_argument("--save", help="Écrit les résultats dans ce fichier JSON.")
+    parser.add_argument("--compare", help="Fichier JSON de référence (résultat d'un --save précédent).")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Ratio au-delà duquel un écart est une régression.")
+    args = parser.parse_args()
+    # Vérifié avant les micro-benchmarks, qui peuvent durer plusieurs minutes
+    if not args.skip_load and httpx is None:
+        print("Erreur : le test de charge nécessite le paquet 'httpx' (pip install httpx), ou utilisez --skip-load.")
+        sys.exit(1)
+
+    first, _, last = args.years.partition("-")
+    span = range(int(first), int(last or first) + 1)
+    years = list(span[::max(1, len(span) // 40)])  # ~40 années réparties, qui tiennent dans le cache des années
+
+    data = synthetic_master(args.data, args.saints)
+    idx = search_index.build_indices(data)
+    rnd = random.Random(7)
+    queries = [((s["nom_ar"] if lang == "ar" else s["nom_fr"])[:rnd.randint(3, 12)], lang)
+               for s, lang in ((rnd.choice(data["saints"]), rnd.choice(["ar", "fr"])) for _ in range(200))]
+
+    results = {"meta": metadata(args)}
+    if not args.skip_micro:
+        print(f"--- Micro-benchmarks ({args.saints} saints, {len(years)} années de {years[0]} à {years[-1]}) ---")
+        results["micro"] = micro_benchmarks(data, idx, years, queries, args.rounds, args.min_time)
+    if not args.skip_load:
+        print(f"\n--- Test de charge ASGI ({args.concurrency} requêtes simultanées) ---")
+        results["load"] = load_test(data, args.requests, args.concurrency, years)
+
+    if args.save:
+        pathlib.Path(args.save).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nRésultats écrits dans : {args.save}")
+    if args.compare:
+        baseline = json.loads(pathlib.Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} régression(s) au-delà de x{args.threshold}.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import datetime
+import pathlib
+import sys
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from app import calendar_core as cc
+
+def scan_window(year_guess):
+    """Version de référence (balayage jour par jour) de locate_fixed_coptic pour toute une fenêtre."""
+    pivot = datetime.date(year_guess, 6, 1)
+    first = {}
+    for d in range(-400, 401):
+        g = pivot + datetime.timedelta(days=d)
+        c = cc.gregorian_to_coptic(g)
+        first.setdefault((c.jour, c.mois_num), g)
+    return first
+
+def main():
+    """
+    Vérifie exhaustivement les conversions copte <-> grégorien :
+    aller-retour jour par jour et équivalence de locate_fixed_coptic avec le balayage ±400 jours.
+    """
+    parser = argparse.ArgumentParser(description="Vérifie les conversions du calendrier copte.")
+    parser.add_argument("--start", type=int, default=1600, help="Première année grégorienne vérifiée.")
+    parser.add_argument("--end", type=int, default=2600, help="Dernière année grégorienne vérifiée.")
+    args = parser.parse_args()
+
+    print(f"--- Vérification des conversions de {args.start} à {args.end} ---")
+    errors = 0
+
+    # 1. Aller-retour grégorien -> copte -> grégorien pour chaque jour
+    d = datetime.date(args.start, 1, 1)
+    end = datetime.date(args.end, 12, 31)
+    prev = None
+    while d <= end:
+        c = cc.gregorian_to_coptic(d)
+        if cc.coptic_to_gregorian(c.jour, c.mois_num, c.annee_copte) != d:
+            print(f"ERREUR aller-retour : {d} -> {c}")
+            errors += 1
+        # Les jours coptes doivent se suivre sans trou ni doublon
+        if prev is not None:
+            expected = (prev.jour + 1, prev.mois_num, prev.annee_copte)
+            if expected[0] > cc.coptic_days_in_month(prev.mois_num, prev.annee_copte):
+                expected = (1, prev.mois_num % 13 + 1, prev.annee_copte + (prev.mois_num == 13))
+            if (c.jour, c.mois_num, c.annee_copte) != expected:
+                print(f"ERREUR continuité : {d} -> {c} (attendu {expected})")
+                errors += 1
+        prev = c
+        d += datetime.timedelta(days=1)
+
+    # 2. locate_fixed_coptic (O(1)) contre le balayage de référence
+    for year in range(args.start + 2, args.end - 1):
+        ref = scan_window(year)
+        for month in range(1, 14):
+            for day in range(1, 31 if month < 13 else 7):
+                try:
+                    got = cc.locate_fixed_coptic(day, month, year)
+                except ValueError:
+                    got = None
+                if got != ref.get((day, month)):
+                    print(f"ERREUR locate {day}/{month} autour de {year} : {got} != {ref.get((day, month))}")
+                    errors += 1
+
+    if errors:
+        print(f"\n{errors} erreur(s) trouvée(s).")
+        sys.exit(1)
+    print("\nSuccès ! Toutes les conversions sont cohérentes.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import collections
+import datetime
+import pathlib
+import sys
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from app import calendar_core as cc
+
+# Statuts de /day qui l'emportent sur toute période de jeûne (règles 1 à 3 de fasting_state)
+OVERRIDES = {"PARAMON", "MAJOR_FEAST_OVERRIDE", "FIFTY_DAYS"}
+
+def main():
+    """
+    Vérifie que la table des occurrences (/next, /occurrences) donne les mêmes fêtes et
+    périodes de jeûne que compute_day (/day), jour par jour sur une plage d'années.
+    """
+    parser = argparse.ArgumentParser(description="Vérifie la table des occurrences contre le calcul jour par jour.")
+    parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
+    parser.add_argument("--start", type=int, default=1900, help="Première année grégorienne vérifiée.")
+    parser.add_argument("--end", type=int, default=2100, help="Dernière année grégorienne vérifiée.")
+    args = parser.parse_args()
+
+    data = cc.load_master(args.data)
+    table = cc.occurrence_table(data)
+    rank = {fp["code"]: i for i, fp in enumerate(data.get("fasting_periods", []))}
+    start, end = datetime.date(args.start, 1, 1), datetime.date(args.end, 12, 31)
+    print(f"--- Vérification des occurrences de {args.start} à {args.end} ---")
+    errors = 0
+
+    feasts = collections.defaultdict(list)
+    status = {}
+    d = start
+    while d <= end:
+        record = cc.compute_day(data, d)
+        for f in record.fetes:
+            feasts[f.code].append(d)
+        status[d] = record.jeune.source_rule
+        d += datetime.timedelta(days=1)
+
+    # 1. Fêtes : mêmes dates, code par code
+    for code in sorted(table.feast_codes | set(feasts)):
+        got = table.between("feast", code, start, end)
+        if got != feasts.get(code, []):
+            missing = sorted(set(feasts.get(code, [])) - set(got))
+            extra = sorted(set(got) - set(feasts.get(code, [])))
+            print(f"ERREUR fête {code} : manquantes {missing[:3]}, en trop {extra[:3]}")
+            errors += 1
+
+    # 2. Périodes de jeûne, dans les deux sens (une période débutée avant `start` compte aussi)
+    lookback = datetime.date(max(args.start - 1, 1), 1, 1)
+    periods = {code: table.between("fast", code, lookback, end) for code in sorted(table.fast_codes)}
+    for d, rule in status.items():
+        if rule in periods and not any(p.debut <= d <= p.fin for p in periods[rule]):
+            print(f"ERREUR {d} : /day applique {rule}, absent de la table")
+            errors += 1
+    for code, items in periods.items():
+        for p in items:
+            d = max(p.debut, start)
+            while d <= min(p.fin, end):
+                rule = status[d]
+                # Le jour doit porter ce code, ou une règle plus prioritaire (Paramon, fête, Khamasin, période mieux classée)
+                if rule != code and rule not in OVERRIDES and not rank.get(rule, len(rank)) < rank[code]:
+                    print(f"ERREUR {d} : période {code} {p.debut}..{p.fin} de la table, /day applique {rule}")
+                    errors += 1
+                d += datetime.timedelta(days=1)
+
+    if errors:
+        print(f"\n{errors} erreur(s) trouvée(s).")
+        sys.exit(1)
+    print(f"\nSuccès ! {sum(map(len, feasts.values()))} fêtes et {sum(map(len, periods.values()))} périodes cohérentes avec /day.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app import snapshot
+from app.validation import DataValidator
+
+# Mesure exécutée dans un processus neuf : temps de chargement et RSS ajoutée, comme au démarrage d'un worker
+# (modules importés avant la mesure, l'API les importe quel que soit le mode)
+MEASURE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from app import calendar_core as cc, search_index, snapshot
+
+def rss_kb():
+    # RSS courante, totale et anonyme (ru_maxrss est hérité du processus parent sous Linux, donc inutilisable ici) ;
+    # la part non anonyme est celle des fichiers projetés (snapshot), partagée entre les workers
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return int(fields["VmRSS"].split()[0]), int(fields["RssAnon"].split()[0])
+
+rss0 = rss_kb()
+t = time.perf_counter()
+if {mode!r} == "snapshot":
+    loaded = snapshot.load_snapshot({snap!r}, {data!r})
+    assert loaded is not None, "snapshot absent ou périmé"
+else:
+    with open({data!r}, encoding="utf-8") as f:
+        data = json.load(f)
+    loaded = (data, search_index.build_indices(data), cc.day_index(data))
+elapsed = time.perf_counter() - t
+rss = rss_kb()
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss[0] - rss0[0], "anon_kb": rss[1] - rss0[1]}}))
+"""
+
+def measure(mode, data_path, snap_path):
+    code = MEASURE.format(root=str(ROOT), mode=mode, data=data_path, snap=snap_path)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+def main():
+    """
+    Valide puis compile master_data.json en snapshot binaire chargé au démarrage par l'API
+    (table des saints par jour copte et postings de recherche en tableaux, lus par mmap).
+    """
+    parser = argparse.ArgumentParser(description="Compile le snapshot binaire des données maîtres.")
+    parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
+    parser.add_argument("--out", default=None, help="Chemin du snapshot (par défaut : à côté du JSON, extension .snap).")
+    parser.add_argument("--schema", default="schemas/master_schema.json", help="Schéma JSON ('' pour ne faire que les vérifications référentielles).")
+    parser.add_argument("--compare", action="store_true", help="Mesure le démarrage (temps, RSS) JSON contre snapshot.")
+    args = parser.parse_args()
+    out = args.out or os.path.splitext(args.data)[0] + ".snap"
+
+    print(f"--- Compilation du snapshot de '{args.data}' ---")
+    try:
+        validator = DataValidator.from_file(args.schema or None)
+        header = snapshot.compile_snapshot(args.data, out, validator)
+    except FileNotFoundError as e:
+        print(f"Erreur : Fichier introuvable - {e.filename}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Erreur : {e}")
+        sys.exit(1)
+    size = pathlib.Path(out).stat().st_size
+    print(f"Succès ! Snapshot v{header['version']} écrit dans : {out} ({size / 1024:.0f} Ko)")
+
+    if args.compare:
+        print("\n--- Démarrage d'un worker ---")
+        for mode in ("json", "snapshot"):
+            m = measure(mode, args.data, out)
+            print(f"{mode:<10} {m['seconds'] * 1000:8.1f} ms   +{m['rss_kb'] / 1024:7.1f} Mo RSS, dont {m['anon_kb'] / 1024:7.1f} Mo propres au processus")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import pathlib
+import sys
+
+# Ajouter le dossier racine du projet au chemin pour pouvoir importer 'app'
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from app.validation import DataValidator
+
+def load_state(path):
+    """État de la validation précédente (empreintes des sections, résultats), ou None."""
+    if not path:
+        return None
+    try:
+        return json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def save_state(path, state):
+    out = pathlib.Path(path)
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(out)
+
+def print_text(report):
+    for issue in report.issues:
+        label = "ERREUR" if issue.severity == "error" else "AVERTISSEMENT"
+        print(f"{label:<14} [{issue.check}] {issue.message}  (chemin : {list(issue.path)})")
+    print(f"\n{len(report.errors)} erreur(s), {len(report.warnings)} avertissement(s) ; "
+          f"{len(report.checked)} vérification(s) lancée(s), {len(report.reused)} reprise(s) du cache, {report.elapsed * 1000:.1f} ms.")
+    print("Succès ! Les données sont valides." if report.ok else "Validation échouée.")
+
+def main():
+    """Valide les données maîtres (schéma et cohérence) ; seules les sections modifiées depuis la dernière exécution sont revérifiées."""
+    parser = argparse.ArgumentParser(description="Validation du schéma et des références de master_data.json.")
+    parser.add_argument("--data", default="data/master_data.json", help="Chemin vers le fichier master_data.json.")
+    parser.add_argument("--schema", default="schemas/master_schema.json", help="Schéma JSON ('' pour ne faire que les vérifications référentielles).")
+    parser.add_argument("--cache", default="", help="Fichier d'état entre deux exécutions (ex: .validation_state.json) ; vide : tout vérifier.")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Sortie lisible ou JSON (intégration continue, éditeurs).")
+    parser.add_argument("--strict", action="store_true", help="Échoue aussi en cas d'avertissements.")
+    args = parser.parse_args()
+
+    try:
+        data = json.loads(pathlib.Path(args.data).read_text(encoding="utf-8"))
+        validator = DataValidator.from_file(args.schema or None)
+    except FileNotFoundError as e:
+        print(f"Erreur : Fichier introuvable - {e.filename}", file=sys.stderr)
+        sys.exit(2)
+    except json.JSONDecodeError as e:
+        print(f"Erreur : Le fichier JSON est mal formaté - {e}", file=sys.stderr)
+        sys.exit(2)
+
+    report = validator.run(data, load_state(args.cache))
+    if args.cache:
+        save_state(args.cache, report.state)
+
+    if args.format == "json":
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print_text(report)
+    sys.exit(0 if report.ok and not (args.strict and report.warnings) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import datetime
+import pathlib
+import sys
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from app import calendar_core as cc
+
+# Repères publiés (calendrier de l'Église copte), indépendants de l'arithmétique testée :
+# (date grégorienne, jour, mois, année copte)
+ANCHORS = [
+    (datetime.date(284, 8, 29), 1, 1, 1),        # ère des Martyrs : 1 Tout 1 = 29 août 284 julien
+    (datetime.date(2025, 9, 11), 1, 1, 1742),    # Nayrouz 1742
+    (datetime.date(2023, 9, 11), 6, 13, 1739),   # 6 Nasi : 1739 est bissextile
+    (datetime.date(2023, 9, 12), 1, 1, 1740),    # ... donc le Nayrouz 1740 tombe le 12 septembre
+    (datetime.date(2025, 1, 7), 29, 4, 1741),    # Noël copte, 29 Kiahk
+]
+
+@pytest.mark.parametrize("gdate, day, month, year", ANCHORS)
+def test_gregorian_to_coptic_anchors(gdate, day, month, year):
+    c = cc.gregorian_to_coptic(gdate)
+    assert (c.jour, c.mois_num, c.annee_copte) == (day, month, year)
+
+@pytest.mark.parametrize("gdate, day, month, year", ANCHORS)
+def test_coptic_to_gregorian_anchors(gdate, day, month, year):
+    assert cc.coptic_to_gregorian(day, month, year) == gdate
+
+def test_epagomenal_sixth_day_only_in_leap_years():
+    assert cc.coptic_days_in_month(13, 1739) == 6
+    assert cc.coptic_days_in_month(13, 1741) == 5
+    with pytest.raises(ValueError):
+        cc.coptic_to_gregorian(6, 13, 1741)
+
+@pytest.mark.parametrize("year, pascha", [
+    (2023, datetime.date(2023, 4, 16)),
+    (2024, datetime.date(2024, 5, 5)),
+    (2025, datetime.date(2025, 4, 20)),
+    (2026, datetime.date(2026, 4, 12)),
+    (2027, datetime.date(2027, 5, 2)),
+])
+def test_coptic_pascha_dates(year, pascha):
+    assert cc.coptic_pascha_date(year) == pascha
@@ -0,0 +1,90 @@
+import json
+import pathlib
+import re
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / "scripts"))
+import import_data
+from app import calendar_core as cc
+from app import data_source
+from app import search_index
+from test_import_data import StubConnection, StubCursor
+
+DATA = json.loads((ROOT / "data" / "master_data.json").read_text(encoding="utf-8"))
+# Saints en ordre d'ids décroissant : l'ordre des données diffère de celui de la clé
+DATA["saints"].reverse()
+
+# --- Base factice : les lignes qu'écrirait scripts/import_data.py, rendues triées par clé comme par ORDER BY ---
+
+class TableCursor:
+    def __init__(self, tables, meta):
+        self.tables, self.meta, self._result = tables, meta, []
+
+    def execute(self, sql, params=None):
+        if "FROM master_meta" in sql:
+            self._result = list(self.meta.items())
+            return
+        table = re.search(r"FROM (\w+)", sql).group(1)
+        spec = next(s for s in import_data.TABLES if s["table"] == table)
+        cols = [c.strip() for c in sql[len("SELECT "):sql.index(" FROM")].split(",")]
+        rows = sorted(spec["rows"](DATA), key=lambda r: r[spec["cols"].index(spec["key"][0])])
+        self._result = [tuple(r[spec["cols"].index(c)] for c in cols) for r in rows]
+
+    def fetchall(self):
+        return self._result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class TablePool:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def getconn(self):
+        return self
+
+    def cursor(self):
+        return self._cursor
+
+    def rollback(self):
+        pass
+
+    def putconn(self, conn):
+        pass
+
+def postgres_source(meta):
+    source = data_source.PostgresSource.__new__(data_source.PostgresSource)
+    source.pool, source.day_cache_cells, source._index = TablePool(TableCursor(None, meta)), 390, None
+    return source
+
+def imported_meta(data):
+    """master_meta telle qu'écrite par run_import."""
+    cur = StubCursor()
+    import_data.run_import(StubConnection(cur), data)
+    return {params[0]: params[1] for sql, params in cur.executed if "INSERT INTO master_meta" in sql}
+
+def test_postgres_load_keeps_the_order_of_the_data():
+    ds = postgres_source(imported_meta(DATA)).load()
+    for table in ("feasts_fixed", "feasts_movable", "fasting_periods"):
+        assert [r["code"] for r in ds.data[table]] == [r["code"] for r in DATA[table]], table
+    assert list(ds.data["paramon_rules"]) == list(DATA["paramon_rules"])
+    # Mêmes fêtes du jour et mêmes classements de recherche que le backend json
+    day_index = cc.compile_day_index(DATA)
+    assert [tuple(f.code for f in cc.day_index(ds.data).lookup(m, d)[0]) for m in range(1, 14) for d in range(1, 31)] == \
+           [tuple(f.code for f in day_index.lookup(m, d)[0]) for m in range(1, 14) for d in range(1, 31)]
+    # Le backend postgres n'indexe que les noms
+    names = [{k: s.get(k) for k in ("id", "nom_ar", "nom_fr", "type", "fiabilite")} for s in DATA["saints"]]
+    from_json = search_index.build_indices({**DATA, "saints": names})
+    for q in ("a", "saint", "mar", "e"):
+        assert [r.get("id") or r.get("code") for r in search_index.search(q, "fr", ds.search_index, limit=50)["results"]] == \
+               [r.get("id") or r.get("code") for r in search_index.search(q, "fr", from_json, limit=50)["results"]]
+
+def test_postgres_load_without_recorded_order_falls_back_to_keys():
+    meta = {k: v for k, v in imported_meta(DATA).items() if k != "record_order"}
+    ds = postgres_source(meta).load()
+    assert [r["code"] for r in ds.data["feasts_fixed"]] == sorted(r["code"] for r in DATA["feasts_fixed"])
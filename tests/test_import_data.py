@@ -0,0 +1,181 @@
+import json
+import pathlib
+import sys
+
+# Les scripts ne forment pas un paquet : leur dossier est ajouté au chemin
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1] / "scripts"))
+import import_data
+
+# --- Connexion DB-API factice : enregistre les requêtes, rejoue l'état des empreintes ---
+
+class StubCursor:
+    """`rowcounts` associe un début de requête au nombre de lignes touchées (entier, ou fonction des paramètres) ;
+    les autres requêtes renvoient -1 comme en DB-API, ce qui fausse tout total qui les compterait."""
+
+    def __init__(self, state=None, rowcounts=None):
+        self.state = state or {}
+        self.rowcounts = rowcounts or {}
+        self.executed = []
+        self.copies = []
+        self.rowcount = -1
+        self._result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.executed.append((sql, params))
+        count = next((c for prefix, c in self.rowcounts.items() if sql.startswith(prefix)), -1)
+        self.rowcount = count(params) if callable(count) else count
+        # Seule lecture faite par l'import : les empreintes d'une table (load_state)
+        self._result = list(self.state.get(params[0], {}).items()) if params and sql.lstrip().startswith("SELECT") else []
+
+    def fetchall(self):
+        return self._result
+
+    def copy_expert(self, sql, buf):
+        self.copies.append((sql, buf.read()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class StubConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+def spec(table):
+    return next(s for s in import_data.TABLES if s["table"] == table)
+
+def sql_matching(cur, fragment):
+    return [sql for sql, _ in cur.executed if fragment in sql]
+
+def statements(cur):
+    """Début (trois mots) de chaque requête exécutée, dans l'ordre."""
+    return [" ".join(sql.split()[:3]) for sql, _ in cur.executed]
+
+COMMEMORATIONS = {"daily_commemorations": [
+    {"jour_copte": 1, "mois_copte": 1, "liste_saints": [1, 2]},
+    {"jour_copte": 1, "mois_copte": 1, "liste_saints": [3]},
+    {"jour_copte": 2, "mois_copte": 1, "liste_saints": [4]},
+]}
+
+def previous_state(data, table):
+    """Empreintes qu'aurait enregistrées un import complet de `data`."""
+    cur = StubCursor()
+    import_data.import_table(cur, spec(table), data, "bulk")
+    copied = cur.copies[-1][1]
+    return {table: dict(line.split("\t")[1:] for line in copied.splitlines())}
+
+# --- COPY ---
+
+def test_copy_rows_escapes_text_format():
+    cur = StubCursor()
+    import_data.copy_rows(cur, "t", ["a", "b", "c"], [(1, None, "x\ty"), ("a\\b", "l1\nl2", "r\r")])
+    assert cur.copies == [("COPY t (a, b, c) FROM STDIN", "1\t\\N\tx\\ty\na\\\\b\tl1\\nl2\tr\\r\n")]
+
+def test_copy_rows_accepts_generator():
+    cur = StubCursor()
+    import_data.copy_rows(cur, "t", ["a"], ((i,) for i in range(3)))
+    assert cur.copies[0][1] == "0\n1\n2\n"
+
+# --- Fusions ensemblistes ---
+
+def test_merge_upsert_only_updates_changed_rows():
+    cur = StubCursor(rowcounts={"INSERT INTO fasting_periods": 3})
+    touched = import_data.merge_upsert(cur, spec("fasting_periods"), "stg_fasting_periods")
+    (sql, _), = cur.executed
+    assert "INSERT INTO fasting_periods AS t" in sql and "FROM stg_fasting_periods" in sql
+    assert "ON CONFLICT (code) DO UPDATE SET debut_type=EXCLUDED.debut_type" in sql
+    assert "code=EXCLUDED.code" not in sql
+    assert "IS DISTINCT FROM (EXCLUDED.debut_type::text" in sql
+    assert touched == 3
+
+def test_merge_replace_deletes_missing_then_inserts_new():
+    cur = StubCursor(rowcounts={"DELETE FROM daily_commemorations": 1, "INSERT INTO daily_commemorations": 5})
+    touched = import_data.merge_replace(cur, spec("daily_commemorations"), "stg_daily_commemorations")
+    delete, insert = (sql for sql, _ in cur.executed)
+    assert delete.startswith("DELETE FROM daily_commemorations t WHERE NOT EXISTS")
+    assert insert.startswith("INSERT INTO daily_commemorations") and "WHERE NOT EXISTS" in insert
+    assert "TRUNCATE" not in delete + insert
+    # Lignes supprimées plus lignes insérées
+    assert touched == 6
+
+# --- Mode incrémental ---
+
+def test_rows_sharing_a_key_are_hashed_together():
+    table = "daily_commemorations"
+    state = previous_state(COMMEMORATIONS, table)
+    assert sorted(state[table]) == ["1/1", "1/2"]
+    # Modifier la première des deux listes du 1/1 doit être détecté
+    edited = {table: [dict(COMMEMORATIONS[table][0], liste_saints=[1, 2, 5])] + COMMEMORATIONS[table][1:]}
+    # La base contient les lignes de COMMEMORATIONS : le DELETE touche celles des clés passées, l'INSERT les lignes en staging
+    in_table = lambda params: sum(f"{c['mois_copte']}/{c['jour_copte']}" in params[0] for c in COMMEMORATIONS[table])
+    cur = StubCursor(state, {"DELETE FROM daily_commemorations": in_table,
+                             "INSERT INTO daily_commemorations": lambda params: len(cur.copies[0][1].splitlines())})
+    read, touched = import_data.import_table(cur, spec(table), edited, "incremental")
+    assert statements(cur) == ["SELECT record_key, content_hash", "CREATE TEMP TABLE", "DELETE FROM daily_commemorations",
+                               "INSERT INTO daily_commemorations", "CREATE TEMP TABLE", "INSERT INTO import_state"]
+    # Les deux lignes du jour modifié sont remplacées, pas celles du 1/2
+    assert cur.copies[0][1] == '1\t1\t[1, 2, 5]\n1\t1\t[3]\n'
+    (delete, params), = [(sql, p) for sql, p in cur.executed if sql.startswith("DELETE FROM daily_commemorations")]
+    assert params == (["1/1"],)
+    # Deux lignes supprimées, deux réinsérées
+    assert read == 3 and touched == 4
+
+def test_incremental_without_changes_touches_nothing():
+    table = "daily_commemorations"
+    cur = StubCursor(previous_state(COMMEMORATIONS, table))
+    assert import_data.import_table(cur, spec(table), COMMEMORATIONS, "incremental") == (3, 0)
+    assert cur.copies == [] and statements(cur) == ["SELECT record_key, content_hash"]
+
+def test_incremental_removes_vanished_keys():
+    table = "daily_commemorations"
+    state = previous_state(COMMEMORATIONS, table)
+    cur = StubCursor(state, {"DELETE FROM daily_commemorations": 1, "INSERT INTO daily_commemorations": 0})
+    remaining = {table: COMMEMORATIONS[table][:2]}
+    assert import_data.import_table(cur, spec(table), remaining, "incremental") == (2, 1)
+    # Rien à mettre en staging ni d'empreinte à écrire : seule la clé disparue est supprimée
+    assert cur.copies == [("COPY stg_daily_commemorations (jour_copte, mois_copte, liste_saints) FROM STDIN", "")]
+    assert statements(cur) == ["SELECT record_key, content_hash", "CREATE TEMP TABLE", "DELETE FROM daily_commemorations",
+                               "INSERT INTO daily_commemorations", "DELETE FROM import_state"]
+    (_, params), = [(sql, p) for sql, p in cur.executed if sql.startswith("DELETE FROM daily_commemorations")]
+    assert params == (["1/2"],)
+    (_, params), = [(sql, p) for sql, p in cur.executed if sql.startswith(f"DELETE FROM {import_data.STATE_TABLE}")]
+    assert params == (table, ["1/2"])
+
+def test_incremental_upsert_stages_changed_records_only():
+    table = "fasting_periods"
+    data = {table: [{"code": "A", "debut_type": "relative_to_pascha", "debut_ref": {"offset": -3}, "fin_type": "relative_to_pascha", "fin_ref": {"offset": -1}},
+                    {"code": "B", "debut_type": "fixed_coptic", "debut_ref": {"jour": 1, "mois": 12}, "fin_type": "fixed_coptic", "fin_ref": {"jour": 16, "mois": 12}}]}
+    state = previous_state(data, table)
+    data[table][1] = dict(data[table][1], intensite="strict")
+    cur = StubCursor(state, {"INSERT INTO fasting_periods": 1})
+    assert import_data.import_table(cur, spec(table), data, "incremental") == (2, 1)
+    staged = cur.copies[0][1].splitlines()
+    assert len(staged) == 1 and staged[0].startswith("B\t")
+    (upsert,) = sql_matching(cur, "ON CONFLICT (code)")
+    assert upsert.startswith("INSERT INTO fasting_periods AS t")
+
+def test_run_import_commits_once_with_meta():
+    data = {"version": "1.2.3", "fasting_periods": [], **COMMEMORATIONS}
+    cur = StubCursor()
+    conn = StubConnection(cur)
+    stats = import_data.run_import(conn, data)
+    assert conn.commits == 1
+    assert [s["table"] for s in stats] == [s["table"] for s in import_data.TABLES]
+    meta = {params[0]: params[1] for sql, params in cur.executed if "INSERT INTO master_meta" in sql}
+    assert meta["version"] == "1.2.3" and meta["fasting_priority"] == "[]"
+    # Ordre des données, que les tables ne conservent pas (clés texte, comme import_state)
+    assert json.loads(meta["record_order"]) == {"feasts_fixed": [], "feasts_movable": [], "saints": [], "fasting_periods": [], "paramon_rules": []}
+    # L'empreinte du contenu change avec les données, même à version égale (révision du backend postgres)
+    assert meta["content_sha256"] == import_data.content_hash(data)
+    edited = dict(data, daily_commemorations=COMMEMORATIONS["daily_commemorations"][:1])
+    assert import_data.content_hash(edited) != meta["content_sha256"]
@@ -0,0 +1,47 @@
+import datetime
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app import calendar_core as cc
+
+DATA = cc.load_master(str(ROOT / "data" / "master_data.json"))
+
+def per_day(start, end, lang="ar"):
+    return [cc.build_day(DATA, start + datetime.timedelta(days=i), lang) for i in range((end - start).days + 1)]
+
+@pytest.mark.parametrize("year", [cc.MIN_YEAR, 2023, 2024, 2025, cc.MAX_YEAR])
+@pytest.mark.parametrize("lang", ["ar", "fr"])
+def test_year_cache_matches_build_day(year, lang):
+    days = cc.build_year_cache(DATA, year, lang)
+    assert days == per_day(datetime.date(year, 1, 1), datetime.date(year, 12, 31), lang)
+
+@pytest.mark.parametrize("start, end", [
+    # Nouvel an grégorien
+    (datetime.date(2024, 12, 20), datetime.date(2025, 1, 15)),
+    # Nayrouz après une année copte bissextile (6 Nasi 1739, 1 Tout 1740 le 12 septembre)
+    (datetime.date(2023, 9, 1), datetime.date(2023, 9, 20)),
+    # Nayrouz ordinaire, puis 29 février 2024 dans la même plage
+    (datetime.date(2024, 9, 1), datetime.date(2024, 9, 20)),
+    (datetime.date(2023, 8, 1), datetime.date(2024, 3, 31)),
+    # Plusieurs années civiles et coptes d'un coup
+    (datetime.date(2019, 6, 1), datetime.date(2022, 2, 1)),
+    # Bornes des années prises en charge
+    (datetime.date(cc.MIN_YEAR, 1, 1), datetime.date(cc.MIN_YEAR + 1, 1, 31)),
+    (datetime.date(cc.MAX_YEAR - 1, 12, 1), datetime.date(cc.MAX_YEAR, 12, 31)),
+])
+def test_range_matches_build_day(start, end):
+    records = cc.compute_range(DATA, start, end)
+    assert [r.to_dict("fr") for r in records] == per_day(start, end, "fr")
+    assert list(cc.iter_range(DATA, start, end)) == records
+
+def test_range_with_cold_year_cache():
+    # Le balayage ne doit pas dépendre des années déjà compilées par les tests précédents
+    cc.clear_year_cache()
+    start, end = datetime.date(2030, 12, 25), datetime.date(2031, 1, 10)
+    records = cc.compute_range(DATA, start, end)
+    cc.clear_year_cache()
+    assert [r.to_dict("ar") for r in records] == per_day(start, end)
@@ -0,0 +1,29 @@
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app import calendar_core as cc
+from app import search_index
+
+DATA = cc.load_master(str(ROOT / "data" / "master_data.json"))
+INDEX = search_index.build_indices(DATA)
+
+def scanned(nq, lang):
+    """Référence : balayage exact de tous les textes de recherche."""
+    return [i for i, doc in enumerate(INDEX["docs"]) if nq in doc[f"search_{lang}"]]
+
+@pytest.mark.parametrize("lang", ["ar", "fr"])
+def test_short_and_long_queries_match_a_scan(lang):
+    texts = INDEX["postings"][lang]["texts"]
+    # Toutes les sous-chaînes de 1 à 4 caractères du premier texte, plus des requêtes absentes
+    queries = {texts[0][i:i+n] for n in range(1, 5) for i in range(len(texts[0]) - n + 1)} | {"#", "§x", "qqqq"}
+    for nq in sorted(queries):
+        assert list(search_index._matches(nq, INDEX["postings"][lang])) == scanned(nq, lang), nq
+
+def test_single_character_query_ranks_and_pages():
+    result = search_index.search("a", "fr", INDEX, limit=5)
+    assert result["total"] == len(scanned("a", "fr"))
+    assert len(result["results"]) == 5
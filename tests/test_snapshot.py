@@ -0,0 +1,62 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app import calendar_core as cc
+from app import data_source
+from app import search_index
+from app import snapshot
+
+DATA_PATH = ROOT / "data" / "master_data.json"
+SCHEMA_PATH = str(ROOT / "schemas" / "master_schema.json")
+
+@pytest.fixture()
+def paths(tmp_path):
+    data = tmp_path / "master_data.json"
+    data.write_bytes(DATA_PATH.read_bytes())
+    return data, tmp_path / "master_data.snap"
+
+def load(data, snap):
+    return data_source.JsonSource(str(data), str(snap), SCHEMA_PATH).load()
+
+def test_snapshot_serves_the_same_days_and_search(paths):
+    data, snap = paths
+    from_json = load(data, snap)
+    snapshot.compile_snapshot(str(data), str(snap), data_source.JsonSource(str(data), str(snap), SCHEMA_PATH).validator())
+    from_snap = load(data, snap)
+    assert (from_json.source, from_snap.source) == ("json", "snapshot")
+    assert from_snap.revision == from_json.revision
+    # Les saints ne sont plus dans les données : lus jour par jour dans les tableaux du snapshot
+    assert "saints" not in from_snap.data
+    for lang in ("ar", "fr"):
+        assert cc.build_year_cache(from_snap.data, 2025, lang) == cc.build_year_cache(from_json.data, 2025, lang)
+        for q in ("", "a", "ma", "saint", "مر", "القديس"):
+            for type_filter in ("all", "saint", "feast"):
+                assert (search_index.search(q, lang, from_snap.search_index, type_filter)
+                        == search_index.search(q, lang, from_json.search_index, type_filter))
+
+def test_saint_table_keeps_none_fields_and_day_order(paths, tmp_path):
+    data, snap = paths
+    master = json.loads(data.read_text(encoding="utf-8"))
+    master["saints"] = [{"id": 7, "nom_ar": "أ"}, {"id": 3, "nom_ar": "ب", "nom_fr": "B", "fiabilite": None}]
+    master["daily_commemorations"] = [{"jour_copte": 1, "mois_copte": 1, "liste_saints": [3, 99, 7]}]
+    data.write_text(json.dumps(master, ensure_ascii=False), encoding="utf-8")
+    snapshot.compile_snapshot(str(data), str(snap))
+    table = snapshot.load_snapshot(str(snap), str(data))["saints"]
+    assert table.on(1, 1) == tuple(cc.compile_day_index(master).lookup(1, 1)[1])
+    assert [s.id for s in table.on(1, 1)] == [3, 7] and table.on(1, 1)[0].fiabilite is None
+    assert table.on(13, 6) == ()
+
+def test_stale_or_unvalidated_snapshot_falls_back_to_json(paths):
+    data, snap = paths
+    snapshot.compile_snapshot(str(data), str(snap))
+    # Compilé sans les vérifications courantes : ignoré
+    assert load(data, snap).source == "json"
+    data.write_bytes(data.read_bytes() + b"\n")
+    assert snapshot.load_snapshot(str(snap), str(data)) is None
+    snap.write_bytes(b"not a snapshot")
+    assert snapshot.load_snapshot(str(snap), str(data)) is None
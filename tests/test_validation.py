@@ -0,0 +1,57 @@
+import json
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+from app.validation import DataValidator
+
+MASTER = json.loads((ROOT / "data" / "master_data.json").read_text(encoding="utf-8"))
+
+# Schéma factorisé : définitions à la racine ($defs et definitions), section avec son propre $id
+SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "$id": "urn:test:master",
+    "type": "object",
+    "required": ["version"],
+    "$defs": {"code": {"type": "string", "pattern": "^[A-Z_]+$"}, "day": {"type": "integer", "minimum": 1, "maximum": 30}},
+    "definitions": {"version": {"type": "string"}},
+    "properties": {
+        "version": {"$ref": "#/definitions/version"},
+        "feasts_fixed": {"type": "array", "items": {"type": "object", "required": ["code"],
+                                                    "properties": {"code": {"$ref": "#/$defs/code"}, "jour_copte": {"$ref": "#/$defs/day"}}}},
+        "saints": {"$id": "urn:test:saints", "type": "array", "items": {"$ref": "#/$defs/saint"},
+                   "$defs": {"saint": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}}}},
+        "fasting_periods": {"$ref": "#/$defs/periods"},
+    },
+}
+SCHEMA["$defs"]["periods"] = {"type": "array", "items": {"type": "object", "required": ["code"]}}
+
+def schema_issues(data, state=None):
+    report = DataValidator(SCHEMA).run(data, state)
+    return sorted((i.check, tuple(i.path)) for i in report.issues if i.check.startswith("schema")), report
+
+def test_refs_resolve_against_the_root_and_section_ids():
+    issues, _ = schema_issues(MASTER)
+    assert issues == []
+    bad = dict(MASTER, version=1, feasts_fixed=[{"code": "lower", "jour_copte": 31}], saints=[{"id": "x"}], fasting_periods=[{}])
+    issues, _ = schema_issues(bad)
+    assert issues == [("schema:fasting_periods", ("fasting_periods", 0)),
+                      ("schema:feasts_fixed", ("feasts_fixed", 0, "code")),
+                      ("schema:feasts_fixed", ("feasts_fixed", 0, "jour_copte")),
+                      ("schema:saints", ("saints", 0, "id")),
+                      ("schema:version", ("version",))]
+
+def test_refs_still_resolve_when_sections_are_revalidated():
+    _, report = schema_issues(MASTER)
+    edited = dict(MASTER, saints=MASTER["saints"] + [{"id": "x"}])
+    issues, report = schema_issues(edited, report.state)
+    assert issues == [("schema:saints", ("saints", len(MASTER["saints"]), "id"))]
+
+@pytest.mark.parametrize("section", ["a/b", "c~d"])
+def test_section_names_are_escaped_in_refs(section):
+    schema = {"type": "object", "properties": {section: {"type": "array", "items": {"type": "integer"}}}}
+    report = DataValidator(schema).run({section: [1, "x"]})
+    assert [tuple(i.path) for i in report.issues if i.check.startswith("schema")] == [(section, 1)]